@@ -0,0 +1,108 @@
+import numpy as np
+import ppb
+
+import config
+from mathutils import camera_contains
+
+ACTIVE = "active"
+DORMANT = "dormant"
+ASLEEP = "asleep"
+
+
+# Decides per update which objects run their on_update. Objects in view or near the player are
+# active and update every tick. Everything else is dormant and updates every dormant_interval
+# seconds with the whole time that passed, so ships keep drifting and toggling their anchor.
+# Objects with can_sleep set don't change on their own and are asleep until they become active again.
+class ActivitySystem:
+    def __init__(self):
+        self.event = None
+        self.clock = 0.0
+        self.near_radius = config.activity_near_radius
+        self.dormant_interval = config.activity_dormant_interval
+        self.states = {}
+        self.last = {}
+        self.due = {}
+        self.coarse = {}
+
+    def update(self, update_event):
+        if update_event is self.event:
+            return self
+        self.event = update_event
+        self.clock += update_event.time_delta
+        self.coarse = {}
+        scene = update_event.scene
+        # Objects known from earlier ticks, new ones stay active until the next tick
+        objects = [obj for obj in self.last if obj in scene.children]
+        self.last = {obj: self.last[obj] for obj in objects}
+        self.due = {obj: self.due[obj] for obj in objects}
+
+        camera = scene.main_camera
+        # The player as last seen by perception
+        perception = getattr(scene, "perception", None)
+        player = None if perception is None else perception.player
+        positions = np.array([(o.position.x, o.position.y) for o in objects], dtype=float).reshape(-1, 2)
+        sizes = np.array([o.size for o in objects], dtype=float)
+        active = camera_contains(camera, positions, sizes)
+        if player is not None:
+            offsets = positions - (player.position.x, player.position.y)
+            active |= np.hypot(offsets[:, 0], offsets[:, 1]) <= self.near_radius
+        self.states = {
+            obj: ACTIVE if is_active else ASLEEP if getattr(obj, "can_sleep", False) else DORMANT
+            for obj, is_active in zip(objects, active.tolist())
+        }
+        return self
+
+    def forget(self, obj):
+        self.last.pop(obj, None)
+        self.due.pop(obj, None)
+        self.states.pop(obj, None)
+
+    def state(self, obj):
+        return self.states.get(obj, ACTIVE)
+
+    # The update event obj should handle now, or None if it skips this tick
+    def update_for(self, obj, update_event):
+        if not config.activity_culling:
+            return update_event
+        self.update(update_event)
+        last = self.last.get(obj)
+        if last is None:
+            self.last[obj] = self.clock
+            # Spread the first coarse updates, so dormant objects don't all update on the same tick
+            self.due[obj] = self.clock + self.dormant_interval * (len(self.last) % 8 + 1) / 8
+            return update_event
+
+        state = self.state(obj)
+        if state == ASLEEP:
+            self.last[obj] = self.clock
+            return None
+        if state == DORMANT and self.clock < self.due[obj]:
+            return None
+        time_delta = self.clock - last
+        self.last[obj] = self.clock
+        self.due[obj] = self.clock + self.dormant_interval
+        if abs(time_delta - update_event.time_delta) < 1e-9:
+            return update_event
+        return self.coarse_event(update_event, time_delta)
+
+    # One catch-up event per distinct time delta and tick, shared by every object that needs it
+    def coarse_event(self, update_event, time_delta):
+        key = round(time_delta, 9)
+        event = self.coarse.get(key)
+        if event is None:
+            event = self.coarse[key] = ppb.events.Update(time_delta=time_delta, scene=update_event.scene)
+            event.source = update_event
+        return event
+
+
+# The tick an update belongs to. Catch-up updates stand for the tick they were made in, so state
+# computed once per tick is shared between them and the tick's own update.
+def origin(update_event):
+    return getattr(update_event, "source", update_event)
+
+
+def activity_system(scene):
+    system = getattr(scene, "activity_system", None)
+    if system is None:
+        system = scene.activity_system = ActivitySystem()
+    return system
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+import argparse
+import ctypes
+import json
+import os
+
+import ppb
+
+ATLAS_ROOT = "assets/atlas"
+MANIFEST = f"{ATLAS_ROOT}/manifest.json"
+SOURCE_ROOT = "assets/sprites"
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+page_size = 1024
+padding = 2
+# Bigger pictures are not worth a slot in the atlas and keep their own texture
+max_sprite_size = 256
+
+
+# A named sub-rectangle of an atlas page. Every region of a page shares the page's surface,
+# so the renderer binds a single texture for all of them.
+class AtlasImage:
+    def __init__(self, page, name, rect):
+        self.page = page
+        self.name = name
+        self.region = rect
+
+    def __repr__(self):
+        return f"<{type(self).__name__} name={self.name!r} region={self.region}>"
+
+    def is_loaded(self):
+        return self.page.is_loaded()
+
+    def load(self, timeout=None):
+        return self.page.load(timeout)
+
+
+class Atlas:
+    def __init__(self, manifest):
+        self.pages = [ppb.Image(f"{ATLAS_ROOT}/{page}") for page in manifest["pages"]]
+        self.images = {
+            name: AtlasImage(self.pages[frame["page"]], name, (frame["x"], frame["y"], frame["w"], frame["h"]))
+            for name, frame in manifest["frames"].items()
+        }
+
+    def __contains__(self, name):
+        return name in self.images
+
+    def __getitem__(self, name):
+        return self.images[name]
+
+
+def load_atlas(manifest=MANIFEST):
+    path = os.path.join(BASE_PATH, manifest)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return Atlas(json.load(f))
+
+
+def sprite_paths(root=SOURCE_ROOT):
+    for directory, _, filenames in sorted(os.walk(os.path.join(BASE_PATH, root))):
+        relative = os.path.relpath(directory, BASE_PATH).replace(os.sep, "/")
+        for filename in sorted(filenames):
+            if filename.lower().endswith((".png", ".jpg")):
+                yield f"{relative}/{filename}"
+
+
+# Shelf packing, tallest sprites first. Opens another page when one is full.
+def pack(sizes, width=page_size, height=page_size):
+    placements = {}
+    page = x = y = shelf = 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], -item[1][0], item[0])):
+        if x + w + padding > width:
+            x, y, shelf = 0, y + shelf, 0
+        if y + h + padding > height:
+            page, x, y, shelf = page + 1, 0, 0, 0
+        placements[name] = (page, x + padding, y + padding)
+        x += w + padding
+        shelf = max(shelf, h + padding)
+    return placements
+
+
+def build(root=SOURCE_ROOT, output=ATLAS_ROOT):
+    import sdl2
+    from sdl2 import sdlimage
+
+    surfaces = {}
+    for name in sprite_paths(root):
+        loaded = sdlimage.IMG_Load(os.path.join(BASE_PATH, name).encode())
+        if not loaded:
+            raise RuntimeError(f"Could not load {name}: {sdlimage.IMG_GetError().decode()}")
+        # Palette sprites are converted, so every page is plain RGBA
+        surface = sdl2.SDL_ConvertSurfaceFormat(loaded, sdl2.SDL_PIXELFORMAT_RGBA32, 0)
+        sdl2.SDL_FreeSurface(loaded)
+        if max(surface.contents.w, surface.contents.h) > max_sprite_size:
+            sdl2.SDL_FreeSurface(surface)
+            continue
+        surfaces[name] = surface
+
+    placements = pack({name: (s.contents.w, s.contents.h) for name, s in surfaces.items()})
+    page_count = max((page for page, _, _ in placements.values()), default=-1) + 1
+    # Pages are cut down to the rows actually used
+    heights = [padding] * page_count
+    for name, (page, x, y) in placements.items():
+        heights[page] = max(heights[page], y + surfaces[name].contents.h + padding)
+    pages = [
+        sdl2.SDL_CreateRGBSurfaceWithFormat(0, page_size, height, 32, sdl2.SDL_PIXELFORMAT_RGBA32)
+        for height in heights
+    ]
+    frames = {}
+    for name, (page, x, y) in sorted(placements.items()):
+        surface = surfaces[name]
+        w, h = surface.contents.w, surface.contents.h
+        # Copy the alpha channel as it is instead of blending onto the empty page
+        sdl2.SDL_SetSurfaceBlendMode(surface, sdl2.SDL_BLENDMODE_NONE)
+        sdl2.SDL_BlitSurface(surface, None, pages[page], ctypes.byref(sdl2.SDL_Rect(x, y, w, h)))
+        sdl2.SDL_FreeSurface(surface)
+        frames[name] = {"page": page, "x": x, "y": y, "w": w, "h": h}
+
+    os.makedirs(os.path.join(BASE_PATH, output), exist_ok=True)
+    names = []
+    for i, page in enumerate(pages):
+        names.append(f"sprites{i}.png")
+        sdlimage.IMG_SavePNG(page, os.path.join(BASE_PATH, output, names[-1]).encode())
+        sdl2.SDL_FreeSurface(page)
+    manifest = {"page_size": page_size, "pages": names, "frames": frames}
+    with open(os.path.join(BASE_PATH, output, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description="Pack the sprites into texture atlas pages and write their manifest")
+    parser.add_argument("--source", default=SOURCE_ROOT)
+    parser.add_argument("--output", default=ATLAS_ROOT)
+    return parser.parse_args(args)
+
+
+if __name__ == '__main__':
+    options = parse_args()
+    result = build(options.source, options.output)
+    print(f"{len(result['frames'])} sprites packed into {len(result['pages'])} page(s) in {options.output}")
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+import argparse
+import contextlib
+import importlib
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from collections import defaultdict
+
+from ppb import events
+from ppb.gomlib import GameObject
+
+import config
+import headless
+import main
+import ships
+
+
+# Plays the player's ship through its key handlers: sails for the closest enemy, turns it abeam and
+# fires the broadside facing it, picks up flotsam when hurt or when it is close, and upgrades as soon
+# as there are enough points.
+class BotPilot(GameObject):
+    player = None
+    decision_interval = 0.3
+    timer = 0
+    turn_step = 15
+
+    def on_update(self, update_event, signal):
+        self.timer += update_event.time_delta
+        if self.player is None or self.timer < self.decision_interval:
+            return
+        self.timer = 0
+        scene = update_event.scene
+        player = self.player
+        if player.upgrade_points >= player.current_upgrade_level + 1:
+            signal(events.KeyPressed(key=player.upgrade, mods=set()))
+
+        enemy = self.closest(player, scene.get(kind=ships.Enemy))
+        flotsam = self.closest(player, scene.get(kind=ships.Flotsam))
+        if enemy is None and flotsam is None:
+            return
+        to_enemy = None if enemy is None else enemy.position - player.position
+        to_flotsam = None if flotsam is None else flotsam.position - player.position
+        wants_flotsam = to_flotsam is not None and (
+            to_enemy is None or player.health < player.max_health or to_flotsam.length < to_enemy.length / 2)
+
+        if wants_flotsam:
+            heading = to_flotsam
+        elif to_enemy.length > self.firing_range(player) * 1.5:
+            heading = to_enemy
+        else:
+            # Alongside: keep the enemy on the nearest side
+            heading = to_enemy.rotate(90 if self.side(player.facing, to_enemy) < 0 else -90)
+        self.steer(player, heading, signal)
+
+        if enemy is not None and to_enemy.length <= self.firing_range(player):
+            cos = (player.facing * to_enemy) / to_enemy.length
+            if abs(cos) < 0.5:
+                key = player.shoot_right_key if self.side(player.facing, to_enemy) < 0 else player.shoot_left_key
+                signal(events.KeyPressed(key=key, mods=set()))
+
+    @staticmethod
+    def closest(player, objects):
+        return min(objects, key=lambda o: (o.position - player.position).length, default=None)
+
+    # Negative when the vector is to the right of the heading
+    @staticmethod
+    def side(facing, vector):
+        return facing.x * vector.y - facing.y * vector.x
+
+    @staticmethod
+    def firing_range(player):
+        return 2.0 + player.projectile_range
+
+    # One turn key per decision, steering on where the ship actually points rather than its target rotation
+    def steer(self, player, heading, signal):
+        angle = math.degrees(math.atan2(self.side(player.facing, heading), player.facing * heading))
+        if angle > self.turn_step:
+            signal(events.KeyPressed(key=player.left, mods=set()))
+        elif angle < -self.turn_step:
+            signal(events.KeyPressed(key=player.right, mods=set()))
+
+
+# Watches one game and ends it when the player sank or no enemies are left
+class Referee(GameObject):
+    player = None
+    clock = 0
+    outcome = None
+
+    def __init__(self, **props):
+        super().__init__(**props)
+        self.enemies = None
+        self.kill_times = []
+        self.upgrade_times = []
+
+    def on_update(self, update_event, signal):
+        self.clock += update_event.time_delta
+        scene = update_event.scene
+        enemies = scene.count(kind=ships.Enemy)
+        if self.enemies is not None and enemies < self.enemies:
+            self.kill_times += [self.clock] * (self.enemies - enemies)
+        self.enemies = enemies
+        while len(self.upgrade_times) < self.player.current_upgrade_level:
+            self.upgrade_times.append(self.clock)
+
+        if self.player not in scene.children:
+            self.outcome = "lost"
+        elif enemies == 0:
+            self.outcome = "won"
+        if self.outcome is not None:
+            signal(events.Quit())
+
+
+# Sets "module.attribute" or "module.Class.attribute" to a value, e.g. "ships.Enemy.sight_radius"
+def apply_override(name, value):
+    module, *path, attribute = name.split(".")
+    owner = importlib.import_module(module)
+    for part in path:
+        owner = getattr(owner, part)
+    setattr(owner, attribute, value)
+
+
+# Runs in a worker process: one headless game, returns a small summary instead of the game state
+def play_game(job):
+    for name, value in job["overrides"].items():
+        apply_override(name, value)
+    config.number_of_enemies = job["enemies"]
+    result = {}
+
+    def setup(scene):
+        main.setup(scene)
+        player = next(scene.get(kind=ships.Player))
+        scene.add(BotPilot(player=player))
+        result["referee"] = scene.add(Referee(player=player))
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        report = headless.run(ticks=round(job["max_seconds"] / job["time_delta"]), time_delta=job["time_delta"],
+                              seed=job["seed"], setup=setup)
+    referee = result["referee"]
+    kills = referee.kill_times
+    return {
+        "group": job["group"],
+        "seed": job["seed"],
+        "outcome": referee.outcome or "timeout",
+        "seconds": referee.clock,
+        "kills": len(kills),
+        "time_to_kill": (kills[-1] / len(kills)) if kills else None,
+        "first_kill": kills[0] if kills else None,
+        "upgrade_times": referee.upgrade_times,
+        "upgrade_level": report["state"]["upgrade_level"],
+        "wall_seconds": report["seconds"],
+    }
+
+
+# Running totals per group of settings, so results can be dropped as soon as they are counted
+class Report:
+    def __init__(self):
+        self.groups = defaultdict(lambda: {
+            "games": 0, "won": 0, "lost": 0, "timeout": 0,
+            "seconds_to_win": 0.0, "kills": 0, "time_to_kill": 0.0, "games_with_kills": 0,
+            "upgrade_level": 0, "upgrade_times": defaultdict(lambda: [0.0, 0]),
+        })
+
+    def add(self, result):
+        group = self.groups[result["group"]]
+        group["games"] += 1
+        group[result["outcome"]] += 1
+        if result["outcome"] == "won":
+            group["seconds_to_win"] += result["seconds"]
+        group["kills"] += result["kills"]
+        if result["time_to_kill"] is not None:
+            group["time_to_kill"] += result["time_to_kill"]
+            group["games_with_kills"] += 1
+        group["upgrade_level"] += result["upgrade_level"]
+        for level, seconds in enumerate(result["upgrade_times"], start=1):
+            group["upgrade_times"][level][0] += seconds
+            group["upgrade_times"][level][1] += 1
+
+    def summary(self):
+        summary = {}
+        for key, g in self.groups.items():
+            summary[key] = {
+                "games": g["games"],
+                "win_rate": g["won"] / g["games"],
+                "loss_rate": g["lost"] / g["games"],
+                "timeout_rate": g["timeout"] / g["games"],
+                "mean_seconds_to_win": g["seconds_to_win"] / g["won"] if g["won"] else None,
+                "mean_kills": g["kills"] / g["games"],
+                "mean_time_to_kill": g["time_to_kill"] / g["games_with_kills"] if g["games_with_kills"] else None,
+                "mean_upgrade_level": g["upgrade_level"] / g["games"],
+                "upgrade_times": {
+                    level: {"games": count, "mean_seconds": total / count}
+                    for level, (total, count) in sorted(g["upgrade_times"].items())
+                },
+            }
+        return summary
+
+
+def make_jobs(games, variations, enemies=config.number_of_enemies, max_seconds=300.0, time_delta=1 / 30, seed=0):
+    names = list(variations)
+    for values in itertools.product(*(variations[name] for name in names)):
+        overrides = dict(zip(names, values))
+        group = json.dumps(overrides, sort_keys=True)
+        for game in range(games):
+            yield {
+                "group": group,
+                "overrides": overrides,
+                "seed": seed + game,
+                "enemies": enemies,
+                "max_seconds": max_seconds,
+                "time_delta": time_delta,
+            }
+
+
+def run_batch(jobs, processes=None, output=None, chunksize=4):
+    report = Report()
+    start = time.perf_counter()
+    count = 0
+    with multiprocessing.Pool(processes or os.cpu_count()) as pool:
+        for result in pool.imap_unordered(play_game, jobs, chunksize):
+            report.add(result)
+            count += 1
+            if output is not None:
+                output.write(json.dumps(result) + "\n")
+            if count % 100 == 0:
+                print(f"{count} games, {time.perf_counter() - start:.0f} s", file=sys.stderr)
+    return report
+
+
+# "ships.Enemy.sight_radius=3,4,5" into the name and the list of values to try
+def parse_variation(text):
+    name, _, values = text.partition("=")
+    return name, [json.loads(value) for value in values.split(",")]
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description="Play many headless games with a bot and report on the balance")
+    parser.add_argument("--games", type=int, default=100, help="games per combination of settings")
+    parser.add_argument("--enemies", type=int, default=config.number_of_enemies)
+    parser.add_argument("--max-seconds", type=float, default=300.0, help="game time before a game counts as a timeout")
+    parser.add_argument("--time-delta", type=float, default=1 / 30)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes, all cores by default")
+    parser.add_argument("--vary", type=parse_variation, action="append", default=[], metavar="NAME=V1,V2",
+                        help="setting to try with each value, e.g. ships.Enemy.sight_radius=3,4,5")
+    parser.add_argument("--output", help="JSON lines file for the result of every game")
+    return parser.parse_args(args)
+
+
+if __name__ == '__main__':
+    options = parse_args()
+    jobs = make_jobs(options.games, dict(options.vary), enemies=options.enemies, max_seconds=options.max_seconds,
+                     time_delta=options.time_delta, seed=options.seed)
+    with open(options.output, "a") if options.output else contextlib.nullcontext() as output:
+        report = run_batch(jobs, options.processes, output)
+    print(json.dumps(report.summary(), indent=1))
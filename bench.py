@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+import argparse
+import contextlib
+import functools
+import json
+import math
+import os
+import platform
+import time
+
+import ppb
+from ppb.gomlib import GameObject
+
+import headless
+import labels
+import main
+import pools
+import rng
+import ships
+import steering
+import weapons
+from mathutils import rotated_vector
+from profiler import SectionTimer
+from spawning import SpawnSampler
+
+DEFAULT_OUTPUT = "bench_results.jsonl"
+
+
+def subsystems():
+    yield ships.Ship, "on_update", "ship movement"
+    yield ships.Player, "on_update", "ship movement"
+    yield ships.Enemy, "on_update", "ai"
+    yield ships.Flotsam, "on_update", "ai"
+    yield steering.FlowField, "update", "steering"
+    yield weapons.ProjectileSystem, "on_update", "projectile update"
+    yield weapons.ProjectileSystem, "collide", "collision"
+    yield labels.IndicatorManager, "on_update", "labels"
+    yield labels.HudLayer, "on_update", "labels"
+
+
+# Keeps a fixed number of cannonballs in flight, fired by random enemies in random directions
+class BallFeeder(GameObject):
+    balls = 0
+
+    def on_update(self, update_event, signal):
+        scene = update_event.scene
+        system = weapons.projectile_system(scene)
+        missing = self.balls - len(system)
+        if missing <= 0:
+            return
+        enemies = list(scene.get(kind=ships.Enemy))
+        if not enemies:
+            return
+        random = rng.stream("bench")
+        for _ in range(missing):
+            shooter = random.choice(enemies)
+            direction = rotated_vector(shooter.facing, random.random() * 360) * (shooter.projectile_damage + 1)
+            system.launch(scene, shooter=shooter, position=shooter.position + direction.normalize() * 0.5,
+                          direction=direction, range=shooter.projectile_range, damage=shooter.projectile_damage)
+
+
+def bench_setup(scene, enemies, balls):
+    random = rng.stream("spawn")
+    w = scene.add(main.Wind())
+    player = scene.add(ships.Player(position=ppb.Vector(0, 0), wind=w, facing=ppb.directions.Up))
+    hud = labels.hud_layer(scene)
+    hud.show(scene, labels.WindLabel(wind=w, player=player))
+    indicators = labels.indicator_manager(scene)
+    indicators.player = player
+    spawns = SpawnSampler(random)
+    spawns.reserve(player.position, player.size)
+    spread = 3 + 2 * math.sqrt(enemies)
+    for _ in range(enemies):
+        position = spawns.place(3, 3 + spread, ships.Enemy.size)
+        angle = random.random() * math.tau
+        enemy_ship = scene.add(ships.Enemy(
+            position=position,
+            wind=w,
+            facing=ppb.Vector(math.cos(angle), math.sin(angle)),
+            is_anchored=True,
+            anchor_timer=random.random() * 20,
+            turn_timer=random.random() * 15))
+        indicators.track(enemy_ship)
+    hud.show(scene, labels.CannonLabel2(player=player))
+    hud.show(scene, labels.LootLabel2(player=player))
+    hud.show(scene, labels.EnemiesLeftLabel())
+    scene.add(BallFeeder(balls=balls))
+
+
+def bench(enemies, balls, ticks, seed=0, time_delta=1 / 60):
+    timer = SectionTimer()
+    # Pools outlive a run, start each one empty so its counts are its own
+    pools.pools.clear()
+    for owner, name, section in subsystems():
+        timer.wrap(owner, name, section)
+    try:
+        # Enemies and hits print, which would dominate the timings
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            report = headless.run(ticks=ticks, time_delta=time_delta, seed=seed,
+                                  setup=functools.partial(bench_setup, enemies=enemies, balls=balls))
+    finally:
+        timer.restore()
+
+    sections = {
+        section: {
+            "seconds": seconds,
+            "calls": timer.calls[section],
+            "ms_per_tick": seconds / ticks * 1000,
+        }
+        for section, seconds in sorted(timer.seconds.items())
+    }
+    other = report["seconds"] - sum(timer.seconds.values())
+    sections["other"] = {"seconds": other, "calls": ticks, "ms_per_tick": other / ticks * 1000}
+    return {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "enemies": enemies,
+        "balls": balls,
+        "ticks": ticks,
+        "seed": seed,
+        "seconds": report["seconds"],
+        "ms_per_tick": report["seconds"] / ticks * 1000,
+        "sections": sections,
+        "pools": pools.stats(),
+    }
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description="Time the simulation subsystems for growing numbers of enemies")
+    parser.add_argument("--enemies", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--balls", type=int, default=100, help="cannonballs kept in flight")
+    parser.add_argument("--ticks", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON lines file the results are appended to")
+    return parser.parse_args(args)
+
+
+if __name__ == '__main__':
+    options = parse_args()
+    with open(options.output, "a") as output:
+        for enemies in options.enemies:
+            result = bench(enemies, options.balls, options.ticks, seed=options.seed)
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+            print(f"{enemies:>6} enemies {options.balls:>5} balls: {result['ms_per_tick']:8.2f} ms/tick  "
+                  + "  ".join(f"{k} {v['ms_per_tick']:.2f}" for k, v in result["sections"].items()))
@@ -1,11 +1,56 @@
-import ppb
 from ppb import keycodes
 
 DEBUG = False
+# Time every handler (always on with DEBUG), and append one JSON line per frame to profile_output if set
+profile = False
+profile_output = None
+# Seed for rng streams, None plays a different game every time
+seed = None
 
 number_of_enemies = 11
-default_font = ppb.Font("assets/fonts/Fredoka-Regular.ttf", size=24)
-large_font = ppb.Font("assets/fonts/Fredoka-Regular.ttf", size=56)
+# The simulation runs at a fixed rate, frames are drawn at frame_rate in between its steps.
+# After a stall no more than max_simulation_steps are run at once.
+simulation_rate = 30
+max_simulation_steps = 4
+frame_rate = 60
+spatial_cell_size = 2.0
+# Enemies chasing the player steer on a flow_field_size squared grid of cells around it
+flow_field_size = 24
+flow_field_cell_size = 1.0
+# Maximum number of idle objects kept around for reuse, per pooled class
+pool_capacity = {
+    "default": 32,
+    "CannonBall": 128,
+}
+# Ships in view leave a wake particle every interval seconds while they sail
+ship_wakes = True
+wake_interval = 0.25
+font_path = "assets/fonts/Fredoka-Regular.ttf"
+default_font_size = 24
+large_font_size = 56
+hud_font_size = 8
+# Rendered strings kept around for reuse, and the longest HUD number built from the glyph atlas
+text_cache_size = 64
+glyph_text_max_length = 12
+# Off-screen enemy indicators: at most this many, and bearings closer than the angle (degrees) share one
+max_indicators = 8
+indicator_merge_angle = 6
+# Objects off screen and farther than the radius from the player only update every interval seconds
+activity_culling = True
+activity_near_radius = 8.0
+activity_dormant_interval = 0.2
+# Local wind variation, on a grid of wind_grid_size squared nodes that repeats every
+# wind_grid_size * wind_cell_size units
+wind_grid_size = 16
+wind_cell_size = 8.0
+# Endless ocean instead of the arena: square chunks are generated around the player as it sails
+# and stored away once they are farther than chunk_unload_radius chunks
+streamed_world = False
+chunk_size = 16.0
+chunk_load_radius = 1
+chunk_unload_radius = 2
+chunk_enemies = 3
+chunk_flotsam = 1
 
 class Keys:
     left = keycodes.Left
@@ -17,6 +62,8 @@ class Keys:
     use = keycodes.E
     swap = keycodes.Q
 
+    profiler = keycodes.F3
+
 # List of additional properties
 def get_upgrade():
     for upgrade in upgrade_list:
@@ -1,47 +1,114 @@
-import ppb
+import numpy as np
+from ppb.gomlib import GameObject
 
-from ppb.features.animation import Animation
+import resources
+from mathutils import camera_contains
 
-from events import AnimationLooped
 
+# An animation played once per particle, at the given size
+class ParticleKind:
+    def __init__(self, animation, size):
+        self.frames = list(animation._frames)
+        self.frames_per_second = animation.frames_per_second
+        self.size = size
+        self.duration = len(self.frames) / self.frames_per_second
 
-class ObjectWaves(ppb.Sprite):
-    image = Animation("assets/sprites/Effects/Splash{1..3}.png", 3)
-    size = 1
 
+KINDS = {
+    "splash": ParticleKind(resources.animation("assets/sprites/Effects/Splash{1..3}.png", 3), 0.4),
+    "explosion": ParticleKind(resources.animation("assets/sprites/Effects/explosion{1..3}.png", 3), 1),
+    "wake": ParticleKind(resources.animation("assets/sprites/Effects/Splash{1..3}.png", 4), 0.3),
+}
 
-class Splash(ppb.Sprite):
-    image = Animation("assets/sprites/Effects/Splash{1..3}.png", 3)
-    size = 0.4
-    timer = 0
 
-    def __init__(self, **props):
+# Splashes, explosions and wakes as rows of parallel arrays instead of one sprite each. The emitter
+# ages and drops all particles in one step per update, and GameRenderer draws the visible ones in a
+# single batch per texture.
+class ParticleEmitter(GameObject):
+    # Plural names: the emitter is a scene child, and the renderer would read "size" or "position"
+    # as the emitter's own
+    fields = (
+        ("positions", (2,), float),
+        ("starts", (), float),
+        ("kinds", (), np.intp),
+        ("sizes", (), float),
+        ("rotations", (), float),
+    )
+
+    def __init__(self, capacity=256, **props):
         super().__init__(**props)
-        self.duration = self.image.number_of_frames() / self.image.frames_per_second
+        self.clock = 0.0
+        self.count = 0
+        self.capacity = 0
+        self.kind_ids = {name: i for i, name in enumerate(KINDS)}
+        kinds = list(KINDS.values())
+        # Frames of every kind in one list, a particle's frame is its kind's offset plus its age in frames
+        self.frames = [frame for kind in kinds for frame in kind.frames]
+        self.frame_offsets = np.cumsum([0] + [len(kind.frames) for kind in kinds])[:-1]
+        self.frame_counts = np.array([len(kind.frames) for kind in kinds])
+        self.frames_per_second = np.array([kind.frames_per_second for kind in kinds], dtype=float)
+        self.durations = np.array([kind.duration for kind in kinds], dtype=float)
+        self.kind_sizes = np.array([kind.size for kind in kinds], dtype=float)
+        self.resize(capacity)
 
-    def on_update(self, event, signal):
-        if self.timer >= self.duration:
-            signal(AnimationLooped())
-        self.timer += event.time_delta
+    def __len__(self):
+        return self.count
 
-    def on_animation_looped(self, event, signal):
-        event.scene.remove(self)
+    def resize(self, capacity):
+        for name, shape, dtype in self.fields:
+            array = np.zeros((capacity,) + shape, dtype=dtype)
+            if self.count:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
 
+    def emit(self, kind, position, size=None, rotation=0.0):
+        self.emit_many(kind, [(position.x, position.y)], size, rotation)
 
-class Explosion(ppb.Sprite):
-    image = Animation("assets/sprites/Effects/explosion{1..3}.png", 3)
-    size = 1
-    timer = 0
-    run_once = True
-    def __init__(self, **props):
-        super().__init__(**props)
-        self.duration = self.image.number_of_frames() / self.image.frames_per_second
+    # Any number of particles of one kind, positions as (x, y) rows
+    def emit_many(self, kind, positions, sizes=None, rotations=0.0):
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        n = len(positions)
+        capacity = self.capacity
+        while self.count + n > capacity:
+            capacity *= 2
+        if capacity != self.capacity:
+            self.resize(capacity)
+        kind_id = self.kind_ids[kind]
+        rows = slice(self.count, self.count + n)
+        self.positions[rows] = positions
+        self.starts[rows] = self.clock
+        self.kinds[rows] = kind_id
+        self.sizes[rows] = self.kind_sizes[kind_id] if sizes is None else sizes
+        self.rotations[rows] = rotations
+        self.count += n
+
+    def on_update(self, update_event, signal):
+        self.clock += update_event.time_delta
+        if not self.count:
+            return
+        n = self.count
+        alive = self.clock - self.starts[:n] < self.durations[self.kinds[:n]]
+        if alive.all():
+            return
+        self.count = int(alive.sum())
+        for name, _, _ in self.fields:
+            array = getattr(self, name)
+            array[:self.count] = array[:n][alive]
+
+    # Frame index, position, size and rotation of every particle the camera can see
+    def __particles__(self, camera):
+        n = self.count
+        position, size = self.positions[:n], self.sizes[:n]
+        visible = camera_contains(camera, position, size)
+        kind = self.kinds[:n][visible]
+        age = self.clock - self.starts[:n][visible]
+        frames = np.minimum((age * self.frames_per_second[kind]).astype(np.intp), self.frame_counts[kind] - 1)
+        return self.frame_offsets[kind] + frames, position[visible], size[visible], self.rotations[:n][visible]
 
-    def on_update(self, event, signal):
-        if self.timer >= self.duration:
-            signal(AnimationLooped())
-        self.timer += event.time_delta
 
-    def on_animation_looped(self, event, signal):
-        if self.run_once:
-            event.scene.remove(self)
+def particle_emitter(scene):
+    emitter = getattr(scene, "particle_emitter", None)
+    if emitter is None:
+        emitter = scene.particle_emitter = scene.add(ParticleEmitter())
+    return emitter
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import json
+import time
+
+import ppb
+from ppb import events
+from ppb.assetlib import AssetLoadingSystem
+from ppb.camera import Camera
+from ppb.systemslib import System
+
+import config
+import rng
+import ships
+import main
+from scenes import GameScene
+
+
+# Replaces the wall clock: one Update of a fixed length per engine loop, as fast as the CPU allows
+class FixedClock(System):
+    def __init__(self, *, time_delta=1 / 60, ticks=None, **kwargs):
+        super().__init__()
+        self.time_delta = time_delta
+        self.ticks = ticks
+        self.tick = 0
+
+    def on_idle(self, idle_event, signal):
+        if self.ticks is not None and self.tick >= self.ticks:
+            signal(events.Quit())
+            return
+        self.tick += 1
+        signal(events.Update(self.time_delta))
+
+
+# Stands in for the renderer: scenes get a camera to follow the player, but nothing is drawn
+class HeadlessCamera(System):
+    def __init__(self, *, resolution=(800, 600), target_camera_width=25, **kwargs):
+        super().__init__()
+        self.resolution = resolution
+        self.target_camera_width = target_camera_width
+
+    def on_scene_started(self, event, signal):
+        event.scene.main_camera = Camera(None, self.target_camera_width, self.resolution)
+
+
+def make_engine(clock, setup=main.setup, systems=()):
+    return ppb.make_engine(
+        setup,
+        starting_scene=GameScene,
+        basic_systems=(HeadlessCamera, clock, AssetLoadingSystem),
+        systems=systems,
+        title="headless",
+    )
+
+
+def state_digest(scene):
+    digest = hashlib.sha1()
+    for ship in scene.get(kind=ships.Ship):
+        digest.update(repr((type(ship).__name__, ship.position.x, ship.position.y, ship.rotation, ship.health)).encode())
+    return digest.hexdigest()
+
+
+def summarize(scene):
+    player = next(scene.get(kind=ships.Player), None)
+    return {
+        "digest": state_digest(scene),
+        "enemies_left": scene.count(kind=ships.Enemy),
+        "player_health": None if player is None else player.health,
+        "player_position": None if player is None else [player.position.x, player.position.y],
+        "upgrade_level": None if player is None else player.current_upgrade_level,
+    }
+
+
+def run(ticks=1000, time_delta=1 / 60, seed=0, setup=main.setup, systems=()):
+    rng.seed(seed)
+    clock = FixedClock(time_delta=time_delta, ticks=ticks)
+    engine = make_engine(clock, setup=setup, systems=systems)
+    start = time.perf_counter()
+    with engine:
+        engine.run()
+        elapsed = time.perf_counter() - start
+        state = summarize(engine.current_scene)
+    return {
+        "seed": seed,
+        "time_delta": time_delta,
+        "ticks": clock.tick,
+        "seconds": elapsed,
+        "ticks_per_second": clock.tick / elapsed if elapsed else float("inf"),
+        "state": state,
+    }
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description="Run the game without a window and report ticks per second")
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--time-delta", type=float, default=1 / 60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--enemies", type=int, default=config.number_of_enemies)
+    return parser.parse_args(args)
+
+
+if __name__ == '__main__':
+    options = parse_args()
+    config.number_of_enemies = options.enemies
+    print(json.dumps(run(ticks=options.ticks, time_delta=options.time_delta, seed=options.seed)))
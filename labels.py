@@ -1,8 +1,16 @@
-import ppb
-import config
 import math
 
+import numpy as np
+import ppb
+from ppb.gomlib import GameObject
+
+import config
+import resources
 import ships
+import textcache
+from mathutils import camera_contains
+from observable import watch
+from timestep import INTERPOLATED
 
 
 def wind_direction(vector: ppb.Vector):
@@ -27,32 +35,49 @@ def wind_direction(vector: ppb.Vector):
     return str(angle)
 
 
+# Drawn in screen space, screen_position game units from the middle of the screen, above the world.
+# Labels don't poll: they watch the values they show and the HUD layer refreshes them after one
+# changed, at most every min_interval seconds.
 class UILabel(ppb.Sprite):
     image = None
-    update_timer = 0
-    update_interval = 0.5
+    layer = 50
     screen_position = ppb.Vector(1, 1)
+    min_interval = 0
+    hud = None
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
+    def subscribe(self, scene):
+        pass
 
-    def on_update(self, update_event, signal):
-        cam = update_event.scene.main_camera
-        self.position = cam.position + self.screen_position
-        self.update_timer += update_event.time_delta
+    def changed(self, *_):
+        if self.hud is not None:
+            self.hud.pending[self] = None
+
+    def refresh(self, scene, signal):
+        pass
 
 
 class WindLabel(UILabel):
     screen_position = ppb.Vector(-9, -8.5)
     tags = ("Wind", )
+    # The global wind changes every update, more often than the text can be read
+    min_interval = 0.5
     wind = None
+    player = None
 
-    def on_update(self, update_event, signal):
-        super().on_update(update_event, signal)
-        if self.update_timer > self.update_interval:
-            self.update_timer -= self.update_interval
-            self.image = ppb.Text(f"Wind {self.wind.speed:.1f} knots {wind_direction(self.wind.direction)}",
-                                  font=config.large_font, color=(255, 255, 255))
+    def subscribe(self, scene):
+        watch(self.wind, "speed", self.changed)
+        watch(self.wind, "direction", self.changed)
+
+    def refresh(self, scene, signal):
+        # The wind where the player is sailing
+        if self.player is not None:
+            wind = self.wind.at(self.player.position)
+            speed, direction = wind.length, wind
+        else:
+            speed, direction = self.wind.speed, self.wind.direction
+        self.image = textcache.text(f"Wind {speed:.1f} knots {wind_direction(direction)}",
+                                    font=textcache.font(config.font_path, config.large_font_size),
+                                    color=(255, 255, 255))
 
 
 class CannonLabel2(UILabel):
@@ -60,24 +85,19 @@ class CannonLabel2(UILabel):
     tags = ("cannonUI",)
     player = None
 
-    def on_update(self, update_event, signal):
-        if self.player is None:
-            for p in update_event.scene.get(kind="Player"):
-                self.player = p
-                break  # Assuming only one player
-        super().on_update(update_event, signal)
-        if self.update_timer > self.update_interval:
-            self.update_timer -= self.update_interval
-            font = config.default_font
-            font.size = 8
-            self.image = ppb.Text(f"       {self.player.max_projectiles}",
-                                  font=font, color=(255, 255, 255))
+    def subscribe(self, scene):
+        watch(self.player, "max_projectiles", self.changed)
+
+    def refresh(self, scene, signal):
+        font = textcache.font(config.font_path, config.hud_font_size)
+        self.image = textcache.numeric_text(f"       {self.player.max_projectiles}",
+                                            font=font, color=(255, 255, 255))
 
 
 class CannonLabel(UILabel):
     screen_position = ppb.Vector(8.5, 8.8)
     size = 0.5
-    image = ppb.Image("assets/sprites/cannon_icon.png")
+    image = resources.image("assets/sprites/cannon_icon.png")
 
 
 class LootLabel2(UILabel):
@@ -85,55 +105,156 @@ class LootLabel2(UILabel):
     tags = ("cannonUI",)
     player = None
 
-    def on_update(self, update_event, signal):
-        if self.player is None:
-            for p in update_event.scene.get(kind="Player"):
-                self.player = p
-                break  # Assuming only one player
-        super().on_update(update_event, signal)
-        if self.update_timer > self.update_interval:
-            self.update_timer -= self.update_interval
-            font = config.default_font
-            font.size = 8
-            self.image = ppb.Text(f"       {self.player.upgrade_points}",
-                                  font=font, color=(255, 255, 255))
+    def subscribe(self, scene):
+        watch(self.player, "upgrade_points", self.changed)
+
+    def refresh(self, scene, signal):
+        font = textcache.font(config.font_path, config.hud_font_size)
+        self.image = textcache.numeric_text(f"       {self.player.upgrade_points}",
+                                            font=font, color=(255, 255, 255))
 
 
 class LootLabel(UILabel):
     screen_position = ppb.Vector(8.5, 7.5)
     size = 1
-    image = ppb.Image("assets/sprites/chestpack01openwood_withgold.png")
+    image = resources.image("assets/sprites/chestpack01openwood_withgold.png")
 
 
 class Indicator(ppb.Sprite):
-    image = ppb.Image("assets/sprites/Default size/Ship parts/flag (2).png")
-    player = None
-    target = None
+    image = resources.image("assets/sprites/Default size/Ship parts/flag (2).png")
     size = 0.2
-    tags = ("Indicator", )
+    tags = ("Indicator", INTERPOLATED)
+
+
+# Points flags from the player towards off-screen targets. All bearings are computed in one pass,
+# targets inside the camera view are skipped, targets within merge_angle degrees of a closer
+# one share its flag and no more than max_indicators flags are drawn.
+class IndicatorManager(GameObject):
+    player = None
+    distance = 1
+
+    def __init__(self, **props):
+        super().__init__(**props)
+        self.max_indicators = config.max_indicators
+        self.merge_angle = config.indicator_merge_angle
+        self.targets = {}
+        self.indicators = []
+        self.spare = []
+
+    def track(self, target):
+        self.targets[target] = None
+
+    def retarget(self, old, new):
+        if old in self.targets:
+            del self.targets[old]
+            self.targets[new] = None
+
+    def discard(self, target):
+        self.targets.pop(target, None)
+
+    def bearings(self, camera):
+        targets = list(self.targets)
+        positions = np.array([(t.position.x, t.position.y) for t in targets], dtype=float).reshape(-1, 2)
+        sizes = np.array([t.size for t in targets], dtype=float)
+        on_screen = camera_contains(camera, positions, sizes)
+        offsets = positions - (self.player.position.x, self.player.position.y)
+        distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        angles = np.degrees(np.arctan2(offsets[:, 1], offsets[:, 0])) % 360
+
+        # Closest first, a target only gets a flag if it is merge_angle away from every closer flag
+        order = np.flatnonzero(~on_screen)
+        order = order[np.argsort(distances[order], kind="stable")]
+        chosen = []
+        for i in order:
+            if len(chosen) == self.max_indicators:
+                break
+            gaps = np.abs(angles[chosen] - angles[i]) % 360
+            if np.all(np.minimum(gaps, 360 - gaps) >= self.merge_angle):
+                chosen.append(i)
+        return [(targets[i], offsets[i] / max(distances[i], 1e-9)) for i in chosen]
 
     def on_update(self, update_event, signal):
-        if self.player is None or self.target is None:
-            update_event.scene.remove(self)
-        direction = (self.target.position - self.player.position).normalize()
-        self.position = self.player.position + direction
-        self.facing = self.target.position - self.position
+        scene = update_event.scene
+        shown = []
+        if self.player is not None and self.targets:
+            shown = self.bearings(scene.main_camera)
+
+        while len(self.indicators) < len(shown):
+            indicator = self.spare.pop() if self.spare else Indicator()
+            self.indicators.append(scene.add(indicator))
+        while len(self.indicators) > len(shown):
+            indicator = self.indicators.pop()
+            scene.remove(indicator)
+            self.spare.append(indicator)
+
+        for indicator, (target, direction) in zip(self.indicators, shown):
+            indicator.position = self.player.position + ppb.Vector(*direction.tolist()) * self.distance
+            indicator.facing = target.position - indicator.position
+
+
+def indicator_manager(scene):
+    manager = getattr(scene, "indicator_manager", None)
+    if manager is None:
+        manager = scene.indicator_manager = scene.add(IndicatorManager())
+    return manager
 
 
 class WonLabel(UILabel):
     screen_position = ppb.Vector(0, 0)
     size = 4
-    image = ppb.Text("You won!", font=config.large_font, color=(180, 180, 20))
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.image = textcache.text("You won!", font=textcache.font(config.font_path, config.large_font_size),
+                                    color=(180, 180, 20))
 
 
 class EnemiesLeftLabel(UILabel):
     screen_position = ppb.Vector(-11, 9)
+    won = False
 
-    def on_update(self, update_event, signal):
-        super().on_update(update_event, signal)
-        number_of_enemies = len(list(update_event.scene.get(kind=ships.Enemy)))
-        if number_of_enemies == 0:
-            update_event.scene.add(WonLabel())
+    def subscribe(self, scene):
+        scene.watch_count(ships.Enemy, self.changed)
+
+    def refresh(self, scene, signal):
+        number_of_enemies = scene.count(kind=ships.Enemy)
+        if number_of_enemies == 0 and not self.won:
+            self.won = True
+            self.hud.show(scene, WonLabel())
             signal(ppb.events.ScenePaused)
 
-        self.image = ppb.Text(f"{number_of_enemies} left", font=config.default_font, color=(255, 255, 255))
+        font = textcache.font(config.font_path, config.default_font_size)
+        self.image = textcache.text(f"{number_of_enemies} left", font=font, color=(255, 255, 255))
+
+
+# Keeps the HUD labels up to date. Instead of every label updating every frame, labels that
+# watched a value change are queued and refreshed on the next update.
+class HudLayer(GameObject):
+    def __init__(self, **props):
+        super().__init__(**props)
+        self.clock = 0.0
+        self.pending = {}
+        self.refreshed = {}
+
+    def show(self, scene, label):
+        label.hud = self
+        scene.add(label)
+        label.subscribe(scene)
+        self.pending[label] = None
+        return label
+
+    def on_update(self, update_event, signal):
+        self.clock += update_event.time_delta
+        for label in list(self.pending):
+            if self.clock - self.refreshed.get(label, -math.inf) < label.min_interval:
+                continue
+            del self.pending[label]
+            self.refreshed[label] = self.clock
+            label.refresh(update_event.scene, signal)
+
+
+def hud_layer(scene):
+    hud = getattr(scene, "hud_layer", None)
+    if hud is None:
+        hud = scene.hud_layer = scene.add(HudLayer())
+    return hud
@@ -1,23 +1,54 @@
 #!/usr/bin/env python3
+import startup
 import math
-import random
 
+import numpy as np
 import ppb
+from ppb.assetlib import AssetLoadingSystem
 from ppb.gomlib import GameObject
+from ppb.systems import EventPoller, SoundController
 
+import activity
 import ships
-from mathutils import rotated_vector
+from mathutils import dot_product_as_cos, dot_products_as_cos, rotated_vector
+from observable import Observable
 import config
-from labels import LootLabel, LootLabel2, CannonLabel, CannonLabel2, WindLabel, Indicator, EnemiesLeftLabel
+import profiler
+import resources
+import rng
+from renderer import GameRenderer
+from scenes import LoadingScene
+from spawning import SpawnSampler
+from timestep import SimulationClock
+from windfield import WindField
+from world import World
+from labels import LootLabel, LootLabel2, CannonLabel, CannonLabel2, WindLabel, EnemiesLeftLabel
+from labels import hud_layer, indicator_manager
 
+startup.timings.mark("imports")
 
+
+# The global wind changes speed every update and turns every few seconds. The wind field adds
+# local variation on top, ships get their local wind in one batch per update.
 class Wind(GameObject):
-    direction = ppb.directions.Up
-    speed = 1.0
+    # Watched by the HUD
+    direction = Observable(ppb.directions.Up)
+    speed = Observable(1.0)
     timer = 0
     change_interval = 5
 
+    def __init__(self, **props):
+        super().__init__(**props)
+        self.field = WindField(config.wind_grid_size, config.wind_cell_size,
+                               seed=rng.stream("wind field").getrandbits(64))
+        self.field.build(self.direction, self.speed)
+        self.event = None
+        self.rows = {}
+        self.attack = np.zeros(0)
+        self.speeds = np.zeros(0)
+
     def on_update(self, update, signal):
+        random = rng.stream("wind")
         self.speed = max(0.0, min(2.5, self.speed + random.random() * 0.5 - 0.25))
 
         self.timer += update.time_delta
@@ -25,51 +56,93 @@ class Wind(GameObject):
             self.timer -= self.change_interval
             random_rotation_offset = random.random() * 50 - 25
             self.direction = rotated_vector(self.direction, random_rotation_offset).normalize()
+        self.field.evolve(update.time_delta)
+        self.field.build(self.direction, self.speed)
 
     def on_key_pressed(self, event, signal):
         if config.DEBUG and event.key == ppb.keycodes.W:
             rot = 45
             self.direction = rotated_vector(self.direction, rot)
+            self.field.build(self.direction, self.speed)
 
+    def at(self, position):
+        x, y = self.field.sample([(position.x, position.y)])[0].tolist()
+        return ppb.Vector(x, y)
 
-def setup(scene):
-    w = scene.add(Wind())
-    scene.add(WindLabel(wind=w))
-    player = scene.add(ships.Player(position=ppb.Vector(0, 0), wind=w, facing=ppb.directions.Up))
+    def update_ships(self, update_event):
+        update_event = activity.origin(update_event)
+        if update_event is self.event:
+            return self
+        self.event = update_event
+        fleet = list(update_event.scene.get(kind=ships.Ship))
+        self.rows = {ship: i for i, ship in enumerate(fleet)}
+        positions = np.array([(s.position.x, s.position.y) for s in fleet], dtype=float).reshape(-1, 2)
+        facings = np.array([(s.facing.x, s.facing.y) for s in fleet], dtype=float).reshape(-1, 2)
+        winds = self.field.sample(positions)
+        self.speeds = np.hypot(winds[:, 0], winds[:, 1])
+        # Cosine between heading and wind, 1 is running with the wind
+        self.attack = dot_products_as_cos(facings, winds)
+        return self
+
+    # Cosine between the ship's heading and the wind where it is, and the wind speed there
+    def for_ship(self, ship, update_event):
+        i = self.update_ships(update_event).rows.get(ship)
+        if i is None:
+            wind = self.at(ship.position)
+            return (dot_product_as_cos(ship.facing, wind) if wind.length else 0.0), wind.length
+        return float(self.attack[i]), float(self.speeds[i])
+
+
+def spawn_arena(scene, wind, player, indicators):
+    random = rng.stream("spawn")
+    spawns = SpawnSampler(random)
+    spawns.reserve(player.position, player.size)
     difficulty = 1.0
     for e in range(config.number_of_enemies):
-        angle = random.random() * math.tau  # 0 - 360 degrees in radians
-        radius = random.random() * (5*difficulty) + 3
-        spawn_position = ppb.Vector(radius*math.cos(angle), radius*math.sin(angle))
-        # Check for collision once. Not nice but suitable for now
-        for enemy in scene.get(kind=ships.Enemy):
-            if (enemy.position - spawn_position).length <= enemy.size:
-                angle = random.random() * math.tau
-                spawn_position = ppb.Vector(radius * math.cos(angle), radius * math.sin(angle))
+        # Somewhere between 3 and 3 + 5 * difficulty units away, not overlapping any other ship
+        spawn_position = spawns.place(3, 3 + 5*difficulty, ships.Enemy.size)
         angle = random.random() * math.tau
         look_direction = ppb.Vector(math.cos(angle), math.sin(angle))
-        enemy_ship = scene.add(ships.Enemy(
+        enemy_ship = scene.add(ships.Enemy.with_difficulty(
+            difficulty,
             position=spawn_position,
-            wind=w,
+            wind=wind,
             facing=look_direction,
             is_anchored=True,
             anchor_timer=random.random()*20,
-            turn_timer=random.random()*15,
-            max_projectiles=math.ceil(difficulty),
-            projectile_range=1.5 + 0.1 * 2**difficulty,
-            shoot_timeout=1/difficulty))
-        scene.add(Indicator(player=player, target=enemy_ship))
+            turn_timer=random.random()*15))
+        indicators.track(enemy_ship)
         if e > 3:
             difficulty += 0.5
-    scene.add(CannonLabel())
-    scene.add(CannonLabel2(player=player))
-    scene.add(LootLabel())
-    scene.add(LootLabel2(player=player))
-    scene.add(EnemiesLeftLabel())
 
 
-def run():
-    ppb.run(setup, title="Letter of Sean ... or Was It Marque?")
+def setup(scene):
+    # Every sprite is loaded once up front, damage states and effects only swap references
+    resources.preload()
+    w = scene.add(Wind())
+    player = scene.add(ships.Player(position=ppb.Vector(0, 0), wind=w, facing=ppb.directions.Up))
+    hud = hud_layer(scene)
+    hud.show(scene, WindLabel(wind=w, player=player))
+    indicators = indicator_manager(scene)
+    indicators.player = player
+    if config.streamed_world:
+        scene.add(World(player=player, wind=w))
+    else:
+        spawn_arena(scene, w, player, indicators)
+        # The ocean has no end, there is only something to win in the arena
+        hud.show(scene, EnemiesLeftLabel())
+    hud.show(scene, CannonLabel())
+    hud.show(scene, CannonLabel2(player=player))
+    hud.show(scene, LootLabel())
+    hud.show(scene, LootLabel2(player=player))
+    if config.DEBUG or config.profile:
+        profiler.install(scene, Wind)
+
+
+def run(systems=()):
+    ppb.run(setup, starting_scene=LoadingScene, title="Letter of Sean ... or Was It Marque?",
+            basic_systems=(GameRenderer, SimulationClock, EventPoller, SoundController, AssetLoadingSystem),
+            systems=systems, target_frame_rate=config.frame_rate)
 
 
 if __name__ == '__main__':
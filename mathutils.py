@@ -1,4 +1,6 @@
 import math
+
+import numpy as np
 from ppb import Vector
 
 
@@ -30,3 +32,92 @@ def dot_product_as_cos(vec1,vec2):
 def angle_between_a_b(vec1, vec2):
     dp = dot_product(vec1, vec2) / (vec1.length * vec2.length)
     return math.acos(dp)
+
+
+# Fraction of the way along the segment from (x, y) by (dx, dy) where it first enters the circle,
+# 0 if it starts inside, None if it misses
+def segment_circle_entry(x, y, dx, dy, cx, cy, radius):
+    fx, fy = x - cx, y - cy
+    c = fx * fx + fy * fy - radius * radius
+    if c <= 0:
+        return 0.0
+    a = dx * dx + dy * dy
+    b = fx * dx + fy * dy
+    if a == 0 or b >= 0:
+        return None
+    discriminant = b * b - a * c
+    if discriminant < 0:
+        return None
+    t = (-b - math.sqrt(discriminant)) / a
+    return t if t <= 1 else None
+
+
+# Cosine and sine for every multiple of step degrees from -360 to 360, for rotations that always
+# come in fixed steps like the 90 degree broadsides and 15 degree turns
+class TrigTable:
+    def __init__(self, step=15):
+        self.step = step
+        self.values = {}
+        for i in range(-round(360 / step), round(360 / step) + 1):
+            ang_in_rad = i * step / 360.0 * math.tau
+            self.values[i * step] = math.cos(ang_in_rad), math.sin(ang_in_rad)
+
+    def lookup(self, angle_in_degrees):
+        values = self.values.get(angle_in_degrees)
+        if values is None:
+            ang_in_rad = angle_in_degrees / 360.0 * math.tau
+            return math.cos(ang_in_rad), math.sin(ang_in_rad)
+        return values
+
+
+trig_table = TrigTable()
+
+
+# Same as rotated_vector, off the lookup table for angles that are multiples of its step
+def rotated_vector_lut(vector, angle_in_degrees, table=trig_table):
+    c, s = table.lookup(angle_in_degrees)
+    return Vector(c * vector.x + s * vector.y, -s * vector.x + c * vector.y)
+
+
+# Batch versions. Vectors are (n, 2) arrays, angles and factors scalars or arrays of n.
+
+def as_array(vectors):
+    return np.array([(v.x, v.y) for v in vectors], dtype=float).reshape(-1, 2)
+
+
+def rotated_vectors(vectors, angles_in_degrees):
+    vectors = np.asarray(vectors, dtype=float)
+    ang_in_rad = np.radians(angles_in_degrees)
+    c, s = np.cos(ang_in_rad), np.sin(ang_in_rad)
+    x, y = vectors[..., 0], vectors[..., 1]
+    return np.stack((c * x + s * y, -s * x + c * y), axis=-1)
+
+
+def dot_products(vectors1, vectors2):
+    return np.einsum("...i,...i->...", np.asarray(vectors1, dtype=float), np.asarray(vectors2, dtype=float))
+
+
+# 0 where either vector has no length
+def dot_products_as_cos(vectors1, vectors2):
+    lengths = np.linalg.norm(vectors1, axis=-1) * np.linalg.norm(vectors2, axis=-1)
+    dots = dot_products(vectors1, vectors2)
+    return np.divide(dots, lengths, out=np.zeros_like(dots), where=lengths > 0)
+
+
+def angles_between(vectors1, vectors2):
+    return np.arccos(np.clip(dot_products_as_cos(vectors1, vectors2), -1.0, 1.0))
+
+
+def lerp_vectors(a, b, t):
+    t = np.asarray(t, dtype=float)[..., None] if np.ndim(t) else t
+    return np.asarray(a, dtype=float) * (1 - t) + np.asarray(b, dtype=float) * t
+
+
+# Whether something of the given size centred at position is at least partly in the camera's view.
+# With an (n, 2) array of positions, and one size or n sizes, it returns an array of n booleans.
+def camera_contains(camera, position, size=0.0):
+    if isinstance(position, Vector):
+        return (abs(position.x - camera.position.x) <= (camera.width + size) / 2
+                and abs(position.y - camera.position.y) <= (camera.height + size) / 2)
+    return ((np.abs(position[:, 0] - camera.position.x) <= (camera.width + size) / 2)
+            & (np.abs(position[:, 1] - camera.position.y) <= (camera.height + size) / 2))
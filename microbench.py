@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+import argparse
+import random
+import timeit
+
+import numpy as np
+import ppb
+
+import mathutils
+
+
+# Scalar mathutils calls in a loop against their lookup table and batch counterparts
+def mathutils_bench(count=10000, repeat=5, seed=0):
+    r = random.Random(seed)
+    vectors = [ppb.Vector(r.uniform(-1, 1), r.uniform(-1, 1)) for _ in range(count)]
+    others = [ppb.Vector(r.uniform(-1, 1), r.uniform(-1, 1)) for _ in range(count)]
+    broadsides = [r.choice((90, -90)) for _ in range(count)]
+    array, other_array = mathutils.as_array(vectors), mathutils.as_array(others)
+    angle_array = np.array(broadsides, dtype=float)
+    cases = {
+        "rotated_vector": (
+            lambda: [mathutils.rotated_vector(v, a) for v, a in zip(vectors, broadsides)],
+            lambda: [mathutils.rotated_vector_lut(v, a) for v, a in zip(vectors, broadsides)],
+            lambda: mathutils.rotated_vectors(array, angle_array),
+        ),
+        "dot_product": (
+            lambda: [mathutils.dot_product(a, b) for a, b in zip(vectors, others)],
+            None,
+            lambda: mathutils.dot_products(array, other_array),
+        ),
+        "dot_product_as_cos": (
+            lambda: [mathutils.dot_product_as_cos(a, b) for a, b in zip(vectors, others)],
+            None,
+            lambda: mathutils.dot_products_as_cos(array, other_array),
+        ),
+        "angle_between_a_b": (
+            lambda: [mathutils.angle_between_a_b(a, b) for a, b in zip(vectors, others)],
+            None,
+            lambda: mathutils.angles_between(array, other_array),
+        ),
+    }
+    results = {}
+    for name, (scalar, lut, batch) in cases.items():
+        scalar, lut, batch = (None if f is None else min(timeit.repeat(f, number=1, repeat=repeat))
+                              for f in (scalar, lut, batch))
+        results[name] = {
+            "count": count,
+            "scalar_ms": scalar * 1000,
+            "lut_ms": None if lut is None else lut * 1000,
+            "batch_ms": batch * 1000,
+            "batch_speedup": scalar / batch,
+        }
+    return results
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description="Time the scalar mathutils against the batch versions")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args(args)
+
+
+if __name__ == '__main__':
+    options = parse_args()
+    for name, result in mathutils_bench(options.count, options.repeat).items():
+        lut = "" if result["lut_ms"] is None else f"  lut {result['lut_ms']:7.2f} ms"
+        print(f"{name:>20} x{result['count']}: scalar {result['scalar_ms']:7.2f} ms{lut}  "
+              f"batch {result['batch_ms']:6.3f} ms  ({result['batch_speedup']:.0f}x)")
@@ -0,0 +1,29 @@
+from collections import defaultdict
+
+
+# A class attribute whose changes can be watched per instance: after watch(obj, name, callback),
+# callback(obj, value) runs whenever obj.name is set to a different value. Read on the class it is
+# the default value, like a plain class attribute.
+class Observable:
+    def __init__(self, default):
+        self.default = default
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self.default
+        return obj.__dict__.get(self.name, self.default)
+
+    def __set__(self, obj, value):
+        old = obj.__dict__.get(self.name, self.default)
+        obj.__dict__[self.name] = value
+        if value != old:
+            for callback in obj.__dict__.get("_watchers", {}).get(self.name, ()):
+                callback(obj, value)
+
+
+def watch(obj, name, callback):
+    obj.__dict__.setdefault("_watchers", defaultdict(list))[name].append(callback)
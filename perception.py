@@ -0,0 +1,61 @@
+import numpy as np
+import ppb
+
+import activity
+
+
+# Vectors from every enemy and piece of flotsam to the player, computed once per update event.
+# Ships are found by their tags, ships.py uses this module.
+class Perception:
+    def __init__(self):
+        self.event = None
+        self.player = None
+        self.rows = {}
+        self.vectors = np.zeros((0, 2))
+        self.distances = np.zeros(0)
+        self.in_sight = np.zeros(0, dtype=bool)
+
+    def update(self, update_event):
+        update_event = activity.origin(update_event)
+        if update_event is self.event:
+            return self
+        self.event = update_event
+        scene = update_event.scene
+        self.player = next(scene.get(tag="Player"), None)
+        observers = [*scene.get(tag="Enemy"), *scene.get(tag="Flotsam")]
+        if self.player is None:
+            observers = []
+        self.rows = {obj: i for i, obj in enumerate(observers)}
+
+        positions = np.array([(o.position.x, o.position.y) for o in observers], dtype=float).reshape(-1, 2)
+        radii = np.array([o.sight_radius for o in observers], dtype=float)
+        if self.player is not None:
+            self.vectors = np.array([self.player.position.x, self.player.position.y]) - positions
+        else:
+            self.vectors = positions
+        self.distances = np.hypot(self.vectors[:, 0], self.vectors[:, 1])
+        self.in_sight = self.distances <= radii
+        return self
+
+    def sees_player(self, obj):
+        i = self.rows.get(obj)
+        return i is not None and bool(self.in_sight[i])
+
+    def vector_to_player(self, obj):
+        i = self.rows.get(obj)
+        if i is None:
+            return self.player.position - obj.position
+        return ppb.Vector(*self.vectors[i].tolist())
+
+    def distance_to_player(self, obj):
+        i = self.rows.get(obj)
+        if i is None:
+            return (self.player.position - obj.position).length
+        return float(self.distances[i])
+
+
+def scene_perception(scene):
+    perception = getattr(scene, "perception", None)
+    if perception is None:
+        perception = scene.perception = Perception()
+    return perception
@@ -0,0 +1,67 @@
+import config
+
+
+# Idle objects of one kind for reuse. Releasing an object that is already free does nothing, so
+# the same object is never handed out twice.
+class Pool:
+    def __init__(self, factory, capacity=32):
+        self.factory = factory
+        self.capacity = capacity
+        # A dict as an ordered set, last released is first reused
+        self.free = {}
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+
+    def __repr__(self):
+        return f"<Pool {self.factory.__name__} {self.stats()}>"
+
+    def acquire(self, **props):
+        if self.free:
+            obj, _ = self.free.popitem()
+            self.hits += 1
+        else:
+            obj = self.factory()
+            self.misses += 1
+        obj.reset(**props)
+        return obj
+
+    def release(self, obj):
+        if obj in self.free:
+            return
+        if len(self.free) < self.capacity:
+            self.free[obj] = None
+        else:
+            self.dropped += 1
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "dropped": self.dropped,
+            "free": len(self.free),
+            "capacity": self.capacity,
+        }
+
+
+pools = {}
+
+
+def pool_for(kind):
+    pool = pools.get(kind)
+    if pool is None:
+        capacity = config.pool_capacity.get(kind.__name__, config.pool_capacity["default"])
+        pool = pools[kind] = Pool(kind, capacity)
+    return pool
+
+
+def acquire(kind, **props):
+    return pool_for(kind).acquire(**props)
+
+
+def release(obj):
+    pool_for(type(obj)).release(obj)
+
+
+def stats():
+    return {kind.__name__: pool.stats() for kind, pool in pools.items()}
@@ -0,0 +1,191 @@
+import functools
+import json
+import time
+from collections import defaultdict, deque
+
+import ppb
+from ppb.gomlib import GameObject
+
+import config
+import effects
+import labels
+import pools
+import resources
+import ships
+import textcache
+import weapons
+
+HANDLERS = ("on_update", "on_key_pressed", "on_animation_looped")
+# Game object classes of these modules are always timed, main.py passes its own to install
+MODULES = (ships, weapons, labels, effects)
+
+
+# Accumulates time per section. Nested timed calls are subtracted from their caller,
+# so Enemy.on_update only counts the AI and not the Ship.on_update movement it calls.
+# A section can be a name or a function of the instance the handler is called on.
+class SectionTimer:
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.stack = []
+        self.patched = []
+
+    def wrap(self, owner, name, section):
+        original = owner.__dict__[name]
+        timer = self
+
+        @functools.wraps(original)
+        def timed(obj, *args, **kwargs):
+            timer.stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                return original(obj, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = timer.stack.pop()
+                key = section(obj) if callable(section) else section
+                timer.seconds[key] += elapsed - nested
+                timer.calls[key] += 1
+                if timer.stack:
+                    timer.stack[-1] += elapsed
+
+        setattr(owner, name, timed)
+        self.patched.append((owner, name, original))
+
+    def restore(self):
+        for owner, name, original in reversed(self.patched):
+            setattr(owner, name, original)
+        self.patched.clear()
+
+    def reset(self):
+        self.seconds.clear()
+        self.calls.clear()
+
+
+def instrumented_kinds(extra=()):
+    for module in MODULES:
+        for name in dir(module):
+            kind = getattr(module, name)
+            if isinstance(kind, type) and kind.__module__ == module.__name__ and issubclass(kind, GameObject):
+                yield kind
+    yield from extra
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+# Times every game object handler per engine loop and keeps a rolling window of frames per handler.
+# Attributes the time to the type of the object handling the event, e.g. Enemy.on_update.
+class FrameProfiler(GameObject):
+    window = 300
+
+    def __init__(self, kinds=(), output=None, **props):
+        super().__init__(**props)
+        self.timer = SectionTimer()
+        self.history = defaultdict(lambda: deque(maxlen=self.window))
+        self.frame_totals = deque(maxlen=self.window)
+        self.frame = 0
+        self.output = open(output, "a", buffering=1) if output else None
+        for kind in instrumented_kinds(kinds):
+            for handler in HANDLERS:
+                if handler in kind.__dict__:
+                    self.timer.wrap(kind, handler, functools.partial(self.section, handler))
+
+    @staticmethod
+    def section(handler, obj):
+        return f"{type(obj).__name__}.{handler}"
+
+    def close(self):
+        self.timer.restore()
+        if self.output is not None:
+            self.output.close()
+            self.output = None
+
+    def on_idle(self, idle_event, signal):
+        # Everything handled since the last Idle belongs to the previous engine loop
+        if not self.timer.calls:
+            return
+        self.frame += 1
+        total = sum(self.timer.seconds.values())
+        self.frame_totals.append(total)
+        for key, seconds in self.timer.seconds.items():
+            self.history[key].append(seconds)
+        if self.output is not None:
+            self.output.write(json.dumps({
+                "frame": self.frame,
+                "time": time.time(),
+                "total_ms": total * 1000,
+                "handlers": {key: {"ms": seconds * 1000, "calls": self.timer.calls[key]}
+                             for key, seconds in self.timer.seconds.items()},
+                "pools": pools.stats(),
+            }) + "\n")
+        self.timer.reset()
+
+    def on_scene_stopped(self, event, signal):
+        self.close()
+
+    def percentiles(self, key):
+        values = self.history[key]
+        return {f"p{int(q * 100)}": percentile(values, q) * 1000 for q in (0.5, 0.95, 0.99)}
+
+    def slowest(self, count):
+        ranked = sorted(self.history, key=lambda k: percentile(self.history[k], 0.95), reverse=True)
+        return [(key, self.percentiles(key)) for key in ranked[:count]]
+
+
+class ProfilerLine(labels.UILabel):
+    size = 8
+    layer = 100
+
+
+# Top handlers by 95th percentile, toggled with config.Keys.profiler while config.DEBUG is on
+class ProfilerOverlay(GameObject):
+    profiler = None
+    lines = 8
+    visible = False
+    update_timer = 0
+    update_interval = 0.5
+    screen_position = ppb.Vector(-11, 7)
+
+    def __init__(self, **props):
+        super().__init__(**props)
+        self.labels = [
+            ProfilerLine(screen_position=self.screen_position + ppb.Vector(0, -0.6 * i))
+            for i in range(self.lines + 1)
+        ]
+
+    def on_key_pressed(self, key_event, signal):
+        if not config.DEBUG or key_event.key != config.Keys.profiler:
+            return
+        self.visible = not self.visible
+        for label in self.labels:
+            if self.visible:
+                key_event.scene.add(label)
+            else:
+                key_event.scene.remove(label)
+
+    def on_update(self, update_event, signal):
+        self.update_timer += update_event.time_delta
+        if not self.visible or self.update_timer < self.update_interval:
+            return
+        self.update_timer = 0
+        font = textcache.font(config.font_path, config.hud_font_size)
+        totals = self.profiler.frame_totals
+        assets = resources.registry.memory()
+        rows = [(f"frame p95 {percentile(totals, 0.95) * 1000:.2f} ms" if totals else "frame -")
+                + f"  images {assets['loaded']}/{assets['images']} {assets['bytes'] / 2 ** 20:.1f} MiB"]
+        for key, p in self.profiler.slowest(self.lines):
+            rows.append(f"{key} p50 {p['p50']:.2f} p95 {p['p95']:.2f} p99 {p['p99']:.2f} ms")
+        rows += [" "] * (len(self.labels) - len(rows))
+        # Same length for every line, so they are all scaled alike
+        width = max(len(row) for row in rows)
+        for label, row in zip(self.labels, rows):
+            label.image = textcache.text(row.ljust(width), font=font, color=(255, 255, 120))
+
+
+def install(scene, *kinds):
+    profiler = scene.add(FrameProfiler(kinds=kinds, output=config.profile_output))
+    scene.add(ProfilerOverlay(profiler=profiler))
+    return profiler
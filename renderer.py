@@ -0,0 +1,190 @@
+import ctypes
+from collections import defaultdict
+
+import numpy as np
+from ppb import flags
+from ppb.systems.renderer import Renderer, SmartPointer, OPACITY_MODES
+from ppb.systems.sdl_utils import sdl_call
+from sdl2 import (
+    SDL_FLIP_NONE,
+    SDL_Rect,
+    SDL_Vertex,
+    SDL_CreateTextureFromSurface,
+    SDL_DestroyTexture,
+    SDL_QueryTexture,
+    SDL_RenderCopyEx,
+    SDL_RenderGeometry,
+    SDL_RenderPresent,
+    SDL_SetTextureAlphaMod,
+    SDL_SetTextureBlendMode,
+    SDL_SetTextureColorMod,
+)
+
+# Same layout as SDL_Vertex: screen position, color, texture coordinate
+VERTEX = np.dtype([
+    ("x", "f4"), ("y", "f4"),
+    ("r", "u1"), ("g", "u1"), ("b", "u1"), ("a", "u1"),
+    ("u", "f4"), ("v", "f4"),
+])
+# Corners of a quad, and the two triangles it is drawn as
+CORNERS = np.array([(-1, -1), (1, -1), (1, 1), (-1, 1)], dtype=float)
+QUAD = np.array([0, 1, 2, 0, 2, 3], dtype=np.int32)
+
+
+# Draws atlas regions: sprites packed into the same atlas page share one texture and only
+# differ in their source rectangle, so SDL keeps the texture bound between them.
+# Objects with __particles__ are drawn as one batch of textured quads per texture.
+# With a fixed step simulation clock, sprites and the camera are drawn in between simulation steps.
+class GameRenderer(Renderer):
+    region = None
+    interpolation = None
+
+    def on_render(self, render_event, signal):
+        camera = render_event.scene.main_camera
+        self.interpolation = getattr(render_event.scene, "interpolation", None)
+        camera_position = camera.position
+        if self.interpolation is not None:
+            camera.position = self.interpolation.camera_position(camera)
+
+        self.render_background(render_event.scene)
+
+        for game_object in render_event.scene.sprite_layers():
+            if hasattr(game_object, "__particles__"):
+                self.render_particles(game_object, camera)
+                continue
+            texture = self.prepare_resource(game_object)
+            if texture is None:
+                continue
+            src_rect, dest_rect, angle = self.compute_rectangles(
+                texture.inner, game_object, camera
+            )
+            sdl_call(
+                SDL_RenderCopyEx, self.renderer, texture.inner,
+                ctypes.byref(src_rect), ctypes.byref(dest_rect),
+                angle, None, SDL_FLIP_NONE,
+                _check_error=lambda rv: rv < 0
+            )
+        camera.position = camera_position
+        sdl_call(SDL_RenderPresent, self.renderer)
+
+    def texture(self, surface):
+        try:
+            return self._texture_cache[surface]
+        except KeyError:
+            texture = SmartPointer(sdl_call(
+                SDL_CreateTextureFromSurface, self.renderer, surface,
+                _check_error=lambda rv: not rv
+            ), SDL_DestroyTexture)
+            self._texture_cache[surface] = texture
+            return texture
+
+    def render_particles(self, emitter, camera):
+        frames, positions, sizes, rotations = emitter.__particles__(camera)
+        if not len(frames):
+            return
+        # Texture, texture coordinates and aspect of every frame that is on screen
+        by_texture = defaultdict(list)
+        uv = np.zeros((len(emitter.frames), 4))
+        aspect = np.ones((len(emitter.frames), 2))
+        for frame in np.unique(frames).tolist():
+            image = emitter.frames[frame]
+            texture = self.texture(image.load())
+            w, h = ctypes.c_int(), ctypes.c_int()
+            sdl_call(SDL_QueryTexture, texture.inner, None, None, ctypes.byref(w), ctypes.byref(h),
+                     _check_error=lambda rv: rv < 0)
+            x, y, img_w, img_h = getattr(image, "region", None) or (0, 0, w.value, h.value)
+            uv[frame] = x / w.value, y / h.value, (x + img_w) / w.value, (y + img_h) / h.value
+            # The shorter side is as long as the particle's size, like a square sprite
+            aspect[frame] = np.array([img_w, img_h]) / min(img_w, img_h)
+            by_texture[texture].append(frame)
+
+        pixel_ratio = camera.pixel_ratio
+        centres = np.column_stack(((positions[:, 0] - camera.left) * pixel_ratio,
+                                   (camera.top - positions[:, 1]) * pixel_ratio))
+        half = aspect[frames] * (sizes * pixel_ratio / 2)[:, None]
+        # Clockwise on screen, like SDL_RenderCopyEx with the negated rotation
+        angles = np.radians(-rotations)
+        cos, sin = np.cos(angles)[:, None], np.sin(angles)[:, None]
+        dx, dy = CORNERS[None, :, 0] * half[:, :1], CORNERS[None, :, 1] * half[:, 1:]
+        corner_x = centres[:, :1] + dx * cos - dy * sin
+        corner_y = centres[:, 1:] + dx * sin + dy * cos
+        corner_u = np.where(CORNERS[:, 0] < 0, uv[frames, :1], uv[frames, 2:3])
+        corner_v = np.where(CORNERS[:, 1] < 0, uv[frames, 1:2], uv[frames, 3:])
+
+        for texture, texture_frames in by_texture.items():
+            rows = np.isin(frames, texture_frames)
+            count = int(rows.sum())
+            vertices = np.zeros(count * 4, dtype=VERTEX)
+            vertices["r"] = vertices["g"] = vertices["b"] = vertices["a"] = 255
+            vertices["x"] = corner_x[rows].ravel()
+            vertices["y"] = corner_y[rows].ravel()
+            vertices["u"] = corner_u[rows].ravel()
+            vertices["v"] = corner_v[rows].ravel()
+            indices = (np.arange(count, dtype=np.int32)[:, None] * 4 + QUAD).ravel()
+            sdl_call(SDL_SetTextureAlphaMod, texture.inner, 255, _check_error=lambda rv: rv < 0)
+            sdl_call(SDL_SetTextureBlendMode, texture.inner, OPACITY_MODES[flags.BlendModeBlend],
+                     _check_error=lambda rv: rv < 0)
+            sdl_call(SDL_SetTextureColorMod, texture.inner, 255, 255, 255, _check_error=lambda rv: rv < 0)
+            sdl_call(
+                SDL_RenderGeometry, self.renderer, texture.inner,
+                vertices.ctypes.data_as(ctypes.POINTER(SDL_Vertex)), len(vertices),
+                indices.ctypes.data_as(ctypes.POINTER(ctypes.c_int)), len(indices),
+                _check_error=lambda rv: rv < 0
+            )
+
+    def prepare_resource(self, game_object):
+        self.region = None
+        if not self._object_has_dimension(game_object) or not hasattr(game_object, '__image__'):
+            return None
+        image = game_object.__image__()
+        if image is None:
+            return None
+        # Resolve an animation's frame once, load() and the region have to agree
+        if hasattr(image, "frame"):
+            image = image.frame()
+        self.region = getattr(image, "region", None)
+
+        texture = self.texture(image.load())
+
+        opacity = getattr(game_object, 'opacity', 255)
+        opacity_mode = OPACITY_MODES[getattr(game_object, 'opacity_mode', flags.BlendModeBlend)]
+        tint = getattr(game_object, 'tint', (255, 255, 255))
+        sdl_call(SDL_SetTextureAlphaMod, texture.inner, opacity, _check_error=lambda rv: rv < 0)
+        sdl_call(SDL_SetTextureBlendMode, texture.inner, opacity_mode, _check_error=lambda rv: rv < 0)
+        sdl_call(SDL_SetTextureColorMod, texture.inner, *tint[:3], _check_error=lambda rv: rv < 0)
+        return texture
+
+    def compute_rectangles(self, texture, game_object, camera):
+        if self.region is None:
+            w, h = ctypes.c_int(), ctypes.c_int()
+            sdl_call(SDL_QueryTexture, texture, None, None, ctypes.byref(w), ctypes.byref(h),
+                     _check_error=lambda rv: rv < 0)
+            x, y, img_w, img_h = 0, 0, w.value, h.value
+        else:
+            x, y, img_w, img_h = self.region
+        src_rect = SDL_Rect(x=x, y=y, w=img_w, h=img_h)
+
+        if hasattr(game_object, 'width'):
+            obj_w = game_object.width
+            obj_h = game_object.height
+        else:
+            obj_w, obj_h = game_object.size
+
+        screen_position = getattr(game_object, "screen_position", None)
+        if screen_position is not None:
+            # HUD, pinned to the camera which is already where it is drawn from this frame
+            position, rotation = camera.position + screen_position, game_object.rotation
+        elif self.interpolation is None:
+            position, rotation = game_object.position, game_object.rotation
+        else:
+            position = self.interpolation.position(game_object)
+            rotation = self.interpolation.rotation(game_object)
+        win_w, win_h = self.target_resolution(img_w, img_h, obj_w, obj_h, camera.pixel_ratio)
+        center = camera.translate_point_to_screen(position)
+        dest_rect = SDL_Rect(
+            x=int(center.x - win_w / 2),
+            y=int(center.y - win_h / 2),
+            w=win_w,
+            h=win_h,
+        )
+        return src_rect, dest_rect, ctypes.c_double(-rotation)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import random
+import struct
+import time
+import zlib
+
+import ppb
+from ppb import events, keycodes
+from ppb.assetlib import AssetLoadingSystem
+from ppb.systems import SoundController
+from ppb.systemslib import System
+
+import headless
+import main
+import rng
+from renderer import GameRenderer
+from scenes import GameScene
+
+MAGIC = b"BJRP"
+VERSION = 1
+# magic, version, seed, time step, ticks, number of key events, sha1 of the final state
+HEADER = struct.Struct("<4sBqdII20s")
+# tick, pressed or released, key
+EVENT = struct.Struct("<IBH")
+RELEASED = 0
+PRESSED = 1
+
+# Keys by index into this tuple, sorted by name so the numbering does not depend on the ppb version
+KEYS = tuple(sorted(
+    (k for k in vars(keycodes).values() if isinstance(k, keycodes.KeyCode)),
+    key=lambda k: type(k).__name__))
+KEY_INDEX = {k: i for i, k in enumerate(KEYS)}
+
+
+class Replay:
+    def __init__(self, seed, time_delta, ticks=0, key_events=(), digest=None):
+        self.seed = seed
+        self.time_delta = time_delta
+        self.ticks = ticks
+        # (tick, PRESSED or RELEASED, key code) in the order they happened
+        self.key_events = list(key_events)
+        self.digest = digest
+
+    def dumps(self):
+        body = b"".join(EVENT.pack(tick, kind, KEY_INDEX[key]) for tick, kind, key in self.key_events)
+        header = HEADER.pack(MAGIC, VERSION, self.seed, self.time_delta, self.ticks, len(self.key_events),
+                             bytes.fromhex(self.digest or "0" * 40))
+        return header + zlib.compress(body, 9)
+
+    @classmethod
+    def loads(cls, data):
+        magic, version, seed, time_delta, ticks, count, digest = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} replay")
+        body = zlib.decompress(data[HEADER.size:])
+        key_events = [(tick, kind, KEYS[key]) for tick, kind, key in EVENT.iter_unpack(body)]
+        if len(key_events) != count:
+            raise ValueError(f"Replay is truncated, {len(key_events)} of {count} key events")
+        return cls(seed, time_delta, ticks, key_events, None if not any(digest) else digest.hex())
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.dumps())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.loads(f.read())
+
+
+# Writes down the key events and the number of updates before each, and saves the replay on exit
+class Recorder(System):
+    def __init__(self, *, path, seed, **kwargs):
+        super().__init__()
+        self.path = path
+        self.replay = Replay(seed, time_delta=0.0)
+        self.scene = None
+
+    def on_update(self, update_event, signal):
+        # Playback starts straight in the game, updates on the loading screen don't count
+        if not isinstance(update_event.scene, GameScene):
+            return
+        self.replay.ticks += 1
+        self.replay.time_delta = update_event.time_delta
+        self.scene = update_event.scene
+
+    def on_key_pressed(self, key_event, signal):
+        if key_event.key in KEY_INDEX and isinstance(key_event.scene, GameScene):
+            self.replay.key_events.append((self.replay.ticks, PRESSED, key_event.key))
+
+    def on_key_released(self, key_event, signal):
+        if key_event.key in KEY_INDEX and isinstance(key_event.scene, GameScene):
+            self.replay.key_events.append((self.replay.ticks, RELEASED, key_event.key))
+
+    def __exit__(self, *exc):
+        if self.scene is not None:
+            self.replay.digest = headless.state_digest(self.scene)
+        self.replay.save(self.path)
+
+
+# A fixed clock that sends the recorded key events before the update they happened before.
+# In real time the updates are paced like the game's, otherwise they come as fast as possible.
+class ReplayClock(headless.FixedClock):
+    def __init__(self, *, replay, realtime=False, **kwargs):
+        super().__init__(time_delta=replay.time_delta, ticks=replay.ticks)
+        self.key_events = replay.key_events
+        self.next_event = 0
+        self.realtime = realtime
+        self.next_tick = None
+
+    def on_idle(self, idle_event, signal):
+        if self.realtime:
+            now = time.perf_counter()
+            if self.next_tick is not None and now < self.next_tick:
+                return
+            self.next_tick = (self.next_tick or now) + self.time_delta
+        while self.next_event < len(self.key_events) and self.key_events[self.next_event][0] <= self.tick:
+            _, kind, key = self.key_events[self.next_event]
+            signal((events.KeyPressed if kind == PRESSED else events.KeyReleased)(key=key, mods=set()))
+            self.next_event += 1
+        super().on_idle(idle_event, signal)
+
+
+def record(path, seed=None):
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(63)
+    rng.seed(seed)
+    main.run(systems=(Recorder(path=path, seed=seed),))
+
+
+def play(path, realtime=True):
+    replay = Replay.load(path)
+    rng.seed(replay.seed)
+    clock = ReplayClock(replay=replay, realtime=realtime)
+    if realtime:
+        engine = ppb.make_engine(main.setup, starting_scene=GameScene, title="Replay",
+                                 basic_systems=(GameRenderer, clock, SoundController, AssetLoadingSystem))
+    else:
+        engine = headless.make_engine(clock)
+    start = time.perf_counter()
+    with engine:
+        engine.run()
+        elapsed = time.perf_counter() - start
+        state = headless.summarize(engine.current_scene)
+    return {
+        "seed": replay.seed,
+        "ticks": clock.tick,
+        "key_events": len(replay.key_events),
+        "seconds": elapsed,
+        "state": state,
+        "recorded_digest": replay.digest,
+        "matches": replay.digest is None or replay.digest == state["digest"],
+    }
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description="Record a game as seed and key events, or play a recording back")
+    commands = parser.add_subparsers(dest="command", required=True)
+    recording = commands.add_parser("record", help="play the game and record it")
+    recording.add_argument("path")
+    recording.add_argument("--seed", type=int)
+    playing = commands.add_parser("play", help="play a recording back")
+    playing.add_argument("path")
+    playing.add_argument("--headless", action="store_true", help="without a window, as fast as possible")
+    return parser.parse_args(args)
+
+
+if __name__ == '__main__':
+    options = parse_args()
+    if options.command == "record":
+        record(options.path, options.seed)
+    else:
+        result = play(options.path, realtime=not options.headless)
+        print(json.dumps(result))
+        if not result["matches"]:
+            raise SystemExit("Replay diverged from the recording")
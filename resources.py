@@ -0,0 +1,124 @@
+import ctypes
+import os
+
+import ppb
+from ppb.features.animation import Animation, FILE_PATTERN
+
+import atlas
+
+SPRITE_ROOT = "assets/sprites"
+IMAGE_EXTENSIONS = (".png", ".jpg")
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+
+# Process-wide image handles. ppb only shares an Image while something else holds on to it,
+# the registry keeps every sprite alive so swapping a ship's damage state is a plain reference change.
+# Sprites packed by atlas.py are handed out as regions of their atlas page. The atlas manifest is
+# only read when the first image is resolved, importing the game reads no files.
+class AssetRegistry:
+    def __init__(self):
+        self.images = {}
+        self.refs = {}
+        self._atlas = None
+        self._atlas_loaded = False
+
+    def __len__(self):
+        return len(self.images)
+
+    @property
+    def atlas(self):
+        if not self._atlas_loaded:
+            self._atlas = atlas.load_atlas()
+            self._atlas_loaded = True
+        return self._atlas
+
+    def ref(self, path):
+        ref = self.refs.get(path)
+        if ref is None:
+            ref = self.refs[path] = ImageRef(path)
+        return ref
+
+    def image(self, path):
+        handle = self.images.get(path)
+        if handle is None:
+            if self.atlas is not None and path in self.atlas:
+                handle = self.atlas[path]
+            else:
+                handle = ppb.Image(path)
+            self.images[path] = handle
+        return handle
+
+    def preload(self, root=SPRITE_ROOT):
+        for directory, _, filenames in os.walk(os.path.join(BASE_PATH, root)):
+            relative = os.path.relpath(directory, BASE_PATH).replace(os.sep, "/")
+            for filename in sorted(filenames):
+                if filename.lower().endswith(IMAGE_EXTENSIONS):
+                    self.image(f"{relative}/{filename}")
+        return self
+
+    def memory(self):
+        # Atlas regions share their page's surface, which is only counted once
+        surfaces = {}
+        for handle in self.images.values():
+            if handle.is_loaded():
+                surface = handle.load()
+                surfaces[ctypes.addressof(surface.contents)] = surface.contents
+        return {
+            "images": len(self.images),
+            "loaded": sum(handle.is_loaded() for handle in self.images.values()),
+            "textures": len(surfaces),
+            "bytes": sum(surface.pitch * surface.h for surface in surfaces.values()),
+        }
+
+
+# Stands in for a registry image until it is first used, so sprite images can be class attributes
+# without touching the atlas or creating ppb.Images at import
+class ImageRef:
+    def __init__(self, path):
+        self.name = path
+        self._handle = None
+
+    def __repr__(self):
+        return f"<{type(self).__name__} name={self.name!r}>"
+
+    def resolve(self):
+        if self._handle is None:
+            self._handle = registry.image(self.name)
+        return self._handle
+
+    @property
+    def region(self):
+        return getattr(self.resolve(), "region", None)
+
+    def is_loaded(self):
+        return self.resolve().is_loaded()
+
+    def load(self, timeout=None):
+        return self.resolve().load(timeout)
+
+
+registry = AssetRegistry()
+
+
+# An Animation whose frames come from the registry, so they can be atlas regions
+class SharedAnimation(Animation):
+    def _compile_filename(self):
+        match = FILE_PATTERN.search(self._filename)
+        start, end = match.groups()
+        template = FILE_PATTERN.sub('{:0%dd}' % min(len(start), len(end)), self._filename)
+        self._frames = [registry.ref(template.format(n)) for n in range(int(start), int(end) + 1)]
+
+    def frame(self):
+        return self._frames[self.current_frame]
+
+
+def image(path):
+    return registry.ref(path)
+
+
+def animation(filename, frames_per_second):
+    return SharedAnimation(filename, frames_per_second)
+
+
+def preload():
+    return registry.preload()
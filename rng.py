@@ -0,0 +1,18 @@
+import random
+
+import config
+
+streams = {}
+
+
+def seed(value):
+    config.seed = value
+    streams.clear()
+
+
+# Independent random stream per subsystem, so e.g. extra shots do not change where the wind turns
+def stream(name):
+    r = streams.get(name)
+    if r is None:
+        r = streams[name] = random.Random(None if config.seed is None else f"{config.seed}:{name}")
+    return r
@@ -0,0 +1,144 @@
+from collections import defaultdict
+
+import ppb
+from ppb.features.loadingscene import ProgressBarLoadingScene
+from ppb.gomlib import BadChildException, Children, NotMyChildError
+
+import config
+import startup
+
+
+class OrderedSet:
+    def __init__(self):
+        self._items = {}
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, item):
+        self._items[item] = None
+
+    def remove(self, item):
+        del self._items[item]
+
+    def discard(self, item):
+        self._items.pop(item, None)
+
+
+# Children that are walked and queried in the order they were added, so a run only depends on its seed.
+# Children are indexed by every class they inherit from and by the tags passed to add() together with
+# the class level `tags`, so lookups and counts only touch the matching children.
+class OrderedChildren(Children):
+    def __init__(self):
+        super().__init__()
+        self._all = OrderedSet()
+        self._kinds = defaultdict(OrderedSet)
+        self._tags = defaultdict(OrderedSet)
+        self._child_tags = {}
+        self._count_watchers = defaultdict(list)
+
+    def add(self, child, tags=()):
+        if isinstance(child, type):
+            raise BadChildException(child)
+        if isinstance(tags, (str, bytes)):
+            raise TypeError("You passed a string instead of an iterable, this probably isn't what you intended.")
+        tags = (*getattr(child, "tags", ()), *tags)
+        self._all.add(child)
+        for kind in type(child).mro():
+            self._kinds[kind].add(child)
+        for tag in tags:
+            self._tags[tag].add(child)
+        self._child_tags[child] = tags
+        self._counts_changed(child)
+        return child
+
+    def remove(self, child):
+        try:
+            self._all.remove(child)
+        except KeyError as exc:
+            raise NotMyChildError() from exc
+        for kind in type(child).mro():
+            self._kinds[kind].remove(child)
+        for tag in self._child_tags.pop(child):
+            self._tags[tag].discard(child)
+        self._counts_changed(child)
+        return child
+
+    # callback() runs whenever a child of the kind is added or removed
+    def watch_count(self, kind, callback):
+        self._count_watchers[kind].append(callback)
+
+    def _counts_changed(self, child):
+        if not self._count_watchers:
+            return
+        for kind in type(child).mro():
+            for callback in self._count_watchers.get(kind, ()):
+                callback()
+
+    def get(self, *, kind=None, tag=None, **_):
+        if kind is None and tag is None:
+            raise TypeError("get() takes at least one keyword-only argument. 'kind' or 'tag'.")
+        if tag is None:
+            return iter(list(self._kinds[kind]))
+        if kind is None:
+            return iter(list(self._tags[tag]))
+        kinds, tags = self._kinds[kind], self._tags[tag]
+        if len(tags) < len(kinds):
+            kinds, tags = tags, kinds
+        return (x for x in list(kinds) if x in tags)
+
+    def count(self, *, kind=None, tag=None):
+        if kind is None and tag is None:
+            return len(self._all)
+        if tag is None:
+            return len(self._kinds[kind])
+        if kind is None:
+            return len(self._tags[tag])
+        return sum(1 for _ in self.get(kind=kind, tag=tag))
+
+
+class GameScene(ppb.Scene):
+    def __init__(self, *, set_up=None, **props):
+        super().__init__(**props)
+        self.children = OrderedChildren()
+        if set_up is not None:
+            set_up(self)
+
+    def count(self, *, kind=None, tag=None):
+        return self.children.count(kind=kind, tag=tag)
+
+    def watch_count(self, kind, callback):
+        self.children.watch_count(kind, callback)
+
+
+# Shown while the assets load in the background. The game scene is built and set up right away,
+# which queues every asset it needs, and takes over once nothing is left in the queue.
+class LoadingScene(ProgressBarLoadingScene):
+    background_color = (0, 40, 80)
+    segments = 20
+
+    def __init__(self, *, set_up=None, **props):
+        # Up to here the engine started its systems and opened the window
+        startup.timings.mark("engine")
+        self.next_scene = GameScene(set_up=set_up)
+        startup.timings.mark("setup")
+        self.loaded_image = ppb.Square(255, 255, 255)
+        self.unloaded_image = ppb.Square(40, 70, 110)
+        super().__init__(**props)
+
+    def get_progress_sprites(self):
+        for i in range(self.segments):
+            yield ppb.Sprite(position=ppb.Vector((i - (self.segments - 1) / 2) * 0.5, 0), size=0.4)
+
+    def on_idle(self, event, signal):
+        if self._finished and "assets" not in startup.timings.steps:
+            startup.timings.mark("assets")
+            if config.DEBUG or config.profile:
+                print(f"Startup: {startup.timings}")
+        super().on_idle(event, signal)
@@ -1,22 +1,28 @@
 import math
-import random
 
 import ppb
 from ppb.events import KeyReleased, KeyPressed
-from ppb.features.animation import Animation
 
 import config
 import labels
 import mathutils
-from main import Indicator
-from effects import Explosion
-from mathutils import dot_product_as_cos, lerp_vector, rotated_vector
-from weapons import CannonBall
+import resources
+import rng
+from activity import activity_system
+from effects import particle_emitter
+from mathutils import camera_contains, dot_product_as_cos, lerp_vector, rotated_vector_lut
+from observable import Observable
+from perception import scene_perception
+from spatial import ship_index
+from steering import flow_field
+from timestep import INTERPOLATED
+from weapons import projectile_system
 
 
 class Ship(ppb.Sprite):
+    tags = (INTERPOLATED, )
     speed = 1.0
-    image = ppb.Image("assets/sprites/Default size/Ships/ship (3).png")
+    image = resources.image("assets/sprites/Default size/Ships/ship (3).png")
     image_paths = []
     left = None
     right = None
@@ -38,10 +44,11 @@ class Ship(ppb.Sprite):
     target_rotation = None
     shoot_timer = 0
     shoot_timeout = 0.5
+    wake_timer = 0
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.image = ppb.Image(self.image_paths[self.state])
+        self.image = resources.image(self.image_paths[self.state])
         self.health = self.max_health
         if self.target_rotation is None:
             self.target_rotation = (self.rotation + 180) % 360
@@ -52,21 +59,21 @@ class Ship(ppb.Sprite):
 
         # Move
         movement = self.facing * self.speed * update_event.time_delta
-        attack_angle_effect = dot_product_as_cos(self.facing, self.wind.direction)
-        movement += self.wind_effect * self.facing * (max(0.5, attack_angle_effect * self.wind.speed) * update_event.time_delta)
+        attack_angle_effect, wind_speed = self.wind.for_ship(self, update_event)
+        movement += self.wind_effect * self.facing * (max(0.5, attack_angle_effect * wind_speed) * update_event.time_delta)
         if dot_product_as_cos(self.facing, movement) < 0:
             movement = ppb.Vector(0, 0)
         if not self.__dict__.get("is_anchored", False):
             self.position += movement
+            self.leave_wake(scene, update_event.time_delta)
+        ship_index(scene).insert(self, self.position, self.size)
 
         # Sink
         if self.health <= 0:
             # TODO: Start Splash animation and spawn pickup
             flotsam = scene.add(Flotsam(position=self.position))
-            for indicator in scene.get(kind=labels.Indicator):
-                if indicator.target == self:
-                    indicator.target = flotsam
-                    break
+            labels.indicator_manager(scene).retarget(self, flotsam)
+            ship_index(scene).remove(self)
             scene.remove(self)
             return
 
@@ -75,6 +82,15 @@ class Ship(ppb.Sprite):
             direction = self.shortest_rotation_direction(self.rotation, self.target_rotation)
             self.rotate(direction*self.turn_speed*update_event.time_delta)
 
+    # Wakes are only for the eye, ships out of view leave none
+    def leave_wake(self, scene, time_delta):
+        self.wake_timer -= time_delta
+        if (not config.ship_wakes or self.wake_timer > 0
+                or not camera_contains(scene.main_camera, self.position, self.size)):
+            return
+        self.wake_timer = config.wake_interval
+        particle_emitter(scene).emit("wake", self.position - self.facing * (self.size / 2), rotation=self.rotation)
+
     def shortest_rotation_direction(self, from_rotation, to_rotation):
         fro = from_rotation /360 * math.tau
         to = to_rotation /360 * math.tau
@@ -92,7 +108,7 @@ class Ship(ppb.Sprite):
             return
         self.health -= projectile.damage
         self.state = 0 if self.health == self.max_health else 1 if self.health / self.max_health >= 0.5 else 2
-        self.image = ppb.Image(self.image_paths[self.state])
+        self.image = resources.image(self.image_paths[self.state])
         self.speed *= 0.5
 
     def shoot(self, event, angle=None):
@@ -100,15 +116,15 @@ class Ship(ppb.Sprite):
             return
         rotation = angle
         if angle is None:
-            if random.random() < 0.5:
+            if rng.stream("shoot").random() < 0.5:
                 rotation = 90
             else:
                 rotation = -90
-        shoot_direction = rotated_vector(self.facing, rotation)
-        event.scene.add(
-            CannonBall(shooter=self, position=self.position + shoot_direction / shoot_direction.length * 0.5,
-                       direction=shoot_direction * (self.projectile_damage + 1), range=self.projectile_range,
-                       damage=self.projectile_damage))
+        shoot_direction = rotated_vector_lut(self.facing, rotation)
+        projectile_system(event.scene).launch(
+            event.scene, shooter=self, position=self.position + shoot_direction / shoot_direction.length * 0.5,
+            direction=shoot_direction * (self.projectile_damage + 1), range=self.projectile_range,
+            damage=self.projectile_damage)
         self.projectiles_flying += 1
         self.shoot_timer = self.shoot_timeout
 
@@ -120,6 +136,7 @@ class Ship(ppb.Sprite):
 
 
 class Player(Ship):
+    tags = ("Player", INTERPOLATED)
     left = config.Keys.left
     right = config.Keys.right
     shoot_right_key = config.Keys.use
@@ -134,11 +151,18 @@ class Player(Ship):
         "assets/sprites/Default size/Ships/dinghyLarge2.png",
         "assets/sprites/Default size/Ships/dinghyLarge3.png"
     ]
-    upgrade_points = 0
+    # Watched by the HUD
+    upgrade_points = Observable(0)
+    max_projectiles = Observable(Ship.max_projectiles)
     current_upgrade_level = 0
-    upgrades_available = config.get_upgrade()
+    upgrades_available = None
     shoot_timeout = 0.1
 
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        if self.upgrades_available is None:
+            self.upgrades_available = config.get_upgrade()
+
     def on_key_pressed(self, key_event: KeyPressed, signal):
         if key_event.key == self.left:
             self.turn_left()
@@ -146,6 +170,9 @@ class Player(Ship):
             self.turn_right()
         elif key_event.key == self.upgrade:
             self.run_upgrade()
+            # Upgrades can grow the hull, keep the hit index in sync until the next update
+            if self in ship_index(key_event.scene):
+                ship_index(key_event.scene).insert(self, self.position, self.size)
         elif key_event.key == self.toggle_anchor:
             self.is_anchored = not self.is_anchored
         elif key_event.key == self.shoot_right_key:
@@ -200,10 +227,11 @@ class Player(Ship):
                         setattr(self, k, v+attribute)
                     else:
                         setattr(self, k, v)
-            self.image = ppb.Image(self.image_paths[self.state])
+            self.image = resources.image(self.image_paths[self.state])
 
 
 class Enemy(Ship):
+    tags = ("Enemy", INTERPOLATED)
     image_paths = [
         "assets/sprites/Default size/Ships/ship (2).png",
         "assets/sprites/Default size/Ships/ship (8).png",
@@ -219,35 +247,45 @@ class Enemy(Ship):
     sight_radius = 4.0
     player_in_sight = None
     projectile_range = 2.0
+    difficulty = 1.0
+
+    @classmethod
+    def with_difficulty(cls, difficulty, **props):
+        return cls(difficulty=difficulty, max_projectiles=math.ceil(difficulty),
+                   projectile_range=1.5 + 0.1 * 2**difficulty, shoot_timeout=1/difficulty, **props)
 
     def on_update(self, update_event, signal):
+        update_event = activity_system(update_event.scene).update_for(self, update_event)
+        if update_event is None:
+            return
         super().on_update(update_event, signal)
 
         # detect player
-        p = update_event.scene.get(kind=Player)
-        player = next(p)
-        if player is not None and (player.position - self.position).length <= self.sight_radius:
-            self.player_in_sight = player
+        perception = scene_perception(update_event.scene).update(update_event)
+        if perception.player is None:
+            self.player_in_sight = None
+        elif perception.sees_player(self):
+            self.player_in_sight = perception.player
 
         # if player is in sight follow player and do nothing else
         if self.player_in_sight is not None:
             self.is_anchored = False
-            player_vector = self.player_in_sight.position - self.position
-            player_target = (self.player_in_sight.position + self.player_in_sight.facing) - self.position
-            self.target_rotation = (self.basis.angle(player_target) + 180) % 360
+            player_vector = perception.vector_to_player(self)
+            heading = flow_field(update_event.scene).update(update_event).heading(self)
+            self.target_rotation = (self.basis.angle(heading) + 180) % 360
             print(f"{str(self)}, {self.target_rotation:.1f}")
-            distance = player_vector.length
+            distance = perception.distance_to_player(self)
             if distance < self.projectile_range * 0.7:
                 self.target_rotation = self.player_in_sight.rotation
                 if mathutils.dot_product(self.facing, player_vector) > 0.7:  # Approaching player with side
                     self.shoot(update_event)
-            if (self.player_in_sight.position - self.position).length < self.sight_radius * 5:
+            if distance < self.sight_radius * 5:
                 self.player_in_sight = None
         else:
             self.turn_timer += update_event.time_delta
             if self.turn_timer > self.turn_interval:
                 self.turn_timer -= self.turn_interval
-                self.target_rotation = random.random()*360
+                self.target_rotation = rng.stream("ai").random()*360
 
         self.anchor_timer += update_event.time_delta
 
@@ -257,15 +295,20 @@ class Enemy(Ship):
 
 
 class Flotsam(ppb.Sprite):
-    image = Animation("assets/sprites/Default size/Ships/sunk{1..5}.png", 2.5)
+    tags = ("Flotsam", )
+    image = resources.animation("assets/sprites/Default size/Ships/sunk{1..5}.png", 2.5)
+    can_sleep = True
+
+    @property
+    def sight_radius(self):
+        # The player picks flotsam up by sailing into it
+        return self.size
 
     def on_update(self, update_event, signal):
-        for player_ship in update_event.scene.get(kind=Player):
-            if (player_ship.position - self.position).length <= self.size:
-                player_ship.pickup(self)
-                for indicator in update_event.scene.get(kind=labels.Indicator):
-                    if indicator.target == self:
-                        update_event.scene.remove(indicator)
-                        break
-                update_event.scene.remove(self)
-                break
+        if activity_system(update_event.scene).update_for(self, update_event) is None:
+            return
+        perception = scene_perception(update_event.scene).update(update_event)
+        if perception.sees_player(self):
+            perception.player.pickup(self)
+            labels.indicator_manager(update_event.scene).discard(self)
+            update_event.scene.remove(self)
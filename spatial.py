@@ -0,0 +1,74 @@
+import math
+from collections import defaultdict
+
+import config
+
+
+# Uniform grid of square cells. Objects are stored in every cell their bounding circle touches.
+class SpatialHash:
+    def __init__(self, cell_size=1.0):
+        self.cell_size = cell_size
+        # Buckets are dicts rather than sets so they iterate in insertion order
+        self.cells = defaultdict(dict)
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, obj):
+        return obj in self.entries
+
+    def cell(self, x, y):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def cells_covering(self, x, y, radius):
+        x0, y0 = self.cell(x - radius, y - radius)
+        x1, y1 = self.cell(x + radius, y + radius)
+        return tuple((cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1))
+
+    def insert(self, obj, position, radius):
+        cells = self.cells_covering(position.x, position.y, radius)
+        old_cells = self.entries.get(obj)
+        if old_cells == cells:
+            return
+        if old_cells is not None:
+            self._discard(obj, old_cells)
+        for c in cells:
+            self.cells[c][obj] = None
+        self.entries[obj] = cells
+
+    def remove(self, obj):
+        old_cells = self.entries.pop(obj, None)
+        if old_cells is not None:
+            self._discard(obj, old_cells)
+
+    def _discard(self, obj, cells):
+        for c in cells:
+            bucket = self.cells[c]
+            del bucket[obj]
+            if not bucket:
+                del self.cells[c]
+
+    # Objects in every cell the box around the segment from (x0, y0) to (x1, y1) touches
+    def query_segment(self, x0, y0, x1, y1):
+        c0, c1 = self.cell(min(x0, x1), min(y0, y1)), self.cell(max(x0, x1), max(y0, y1))
+        if c0 == c1:
+            return self.cells.get(c0, {})
+        result = {}
+        for cx in range(c0[0], c1[0] + 1):
+            for cy in range(c0[1], c1[1] + 1):
+                result.update(self.cells.get((cx, cy), {}))
+        return result
+
+    def query(self, position, radius):
+        result = {}
+        for c in self.cells_covering(position.x, position.y, radius):
+            result.update(self.cells.get(c, {}))
+        return result
+
+
+def ship_index(scene):
+    index = getattr(scene, "ship_index", None)
+    if index is None:
+        index = scene.ship_index = SpatialHash(config.spatial_cell_size)
+    return index
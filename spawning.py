@@ -0,0 +1,64 @@
+import math
+
+import ppb
+
+import config
+from spatial import SpatialHash
+
+
+# Poisson-disc placement by dart throwing: candidates are drawn in a ring around the origin and
+# rejected while they overlap a circle placed before. The grid only hands out the few circles
+# near a candidate, so placing n circles stays roughly linear.
+class SpawnSampler:
+    attempts = 30
+
+    def __init__(self, random, cell_size=None):
+        self.random = random
+        self.index = SpatialHash(cell_size or config.spatial_cell_size)
+        self.circles = []
+        # How far full rings had to be widened, later circles in the same ring start out there
+        self.widened = {}
+
+    def __len__(self):
+        return len(self.circles)
+
+    def reserve(self, position, radius):
+        self.index.insert(len(self.circles), position, radius)
+        self.circles.append((position.x, position.y, radius))
+
+    def fits(self, x, y, radius):
+        cells = self.index.cells
+        for c in self.index.cells_covering(x, y, radius):
+            for i in cells.get(c, ()):
+                cx, cy, r = self.circles[i]
+                if (cx - x) ** 2 + (cy - y) ** 2 < (r + radius) ** 2:
+                    return False
+        return True
+
+    # A free position between inner and outer distance from the origin. When the ring is
+    # full after all attempts, it is widened until the circle fits, so overlaps never happen.
+    def place(self, inner, outer, radius):
+        ring = inner, outer
+        outer = self.widened.get(ring, outer)
+        while True:
+            for _ in range(self.attempts):
+                angle = self.random.random() * math.tau
+                distance = self.random.random() * (outer - inner) + inner
+                x, y = distance * math.cos(angle), distance * math.sin(angle)
+                if self.fits(x, y, radius):
+                    position = ppb.Vector(x, y)
+                    self.reserve(position, radius)
+                    return position
+            outer += 2 * radius
+            self.widened[ring] = outer
+
+    # A free position with the whole circle inside the rectangle, or None if none was found
+    def place_in(self, left, bottom, width, height, radius):
+        for _ in range(self.attempts):
+            x = left + radius + self.random.random() * (width - 2 * radius)
+            y = bottom + radius + self.random.random() * (height - 2 * radius)
+            if self.fits(x, y, radius):
+                position = ppb.Vector(x, y)
+                self.reserve(position, radius)
+                return position
+        return None
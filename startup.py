@@ -0,0 +1,29 @@
+import json
+import time
+
+# Imported first by main.py, so imports are timed from here
+started = time.perf_counter()
+
+
+# Seconds spent in each step of starting the game: importing the modules, starting the engine,
+# running setup and loading the assets setup asked for
+class StartupTimings:
+    def __init__(self):
+        self.steps = {}
+        self.last = started
+
+    def mark(self, step):
+        if step in self.steps:
+            raise ValueError(f"startup step {step!r} already timed")
+        now = time.perf_counter()
+        self.steps[step] = now - self.last
+        self.last = now
+
+    def report(self):
+        return {**self.steps, "total": self.last - started}
+
+    def __str__(self):
+        return json.dumps({step: round(seconds, 4) for step, seconds in self.report().items()})
+
+
+timings = StartupTimings()
@@ -0,0 +1,93 @@
+import math
+
+import numpy as np
+import ppb
+
+import activity
+import config
+from perception import scene_perception
+from spatial import ship_index
+
+
+# One flow field towards the player, built once per update and shared by every enemy chasing it.
+# The field is a coarse grid around the player: every cell points at the spot just ahead of the
+# player and away from cells crowded with ships, so chasers fan out instead of stacking. Ships
+# sample the cell they are in and push off the ships they overlap, found through the ship index.
+class FlowField:
+    # Weight of the push away from crowded cells and away from overlapping ships
+    crowding = 0.5
+    separation = 2.0
+
+    def __init__(self, size=24, cell_size=1.0):
+        self.size = size
+        self.cell_size = cell_size
+        self.event = None
+        self.player = None
+        self.origin = np.zeros(2)
+        self.vectors = np.zeros((size, size, 2))
+
+    def update(self, update_event):
+        update_event = activity.origin(update_event)
+        if update_event is self.event:
+            return self
+        self.event = update_event
+        scene = update_event.scene
+        self.player = scene_perception(scene).update(update_event).player
+        if self.player is not None:
+            self.build(scene)
+        return self
+
+    def build(self, scene):
+        player = self.player
+        target = player.position + player.facing
+        extent = self.size * self.cell_size
+        # Snapped to whole cells so the field doesn't shift under ships as the player sails
+        corner = (player.position - ppb.Vector(extent, extent) / 2) / self.cell_size
+        self.origin = np.array([math.floor(corner.x), math.floor(corner.y)], dtype=float) * self.cell_size
+
+        # Towards the player from every cell centre
+        steps = (np.arange(self.size) + 0.5) * self.cell_size
+        centres = np.stack(np.meshgrid(self.origin[0] + steps, self.origin[1] + steps, indexing="ij"), axis=-1)
+        towards = np.array([target.x, target.y]) - centres
+        towards /= np.maximum(np.hypot(towards[..., 0], towards[..., 1]), 1e-9)[..., None]
+
+        # Ships per cell and the slope down to emptier cells. A cell's slope doesn't count the
+        # ships in it, so a lone ship is not pushed away from itself.
+        others = [s for s in ship_index(scene).query(player.position, extent / 2) if s is not player]
+        positions = np.array([(s.position.x, s.position.y) for s in others], dtype=float).reshape(-1, 2)
+        cells = np.floor((positions - self.origin) / self.cell_size).astype(int)
+        inside = np.all((cells >= 0) & (cells < self.size), axis=1)
+        density = np.zeros((self.size, self.size))
+        np.add.at(density, tuple(cells[inside].T), 1)
+        slope = np.stack(np.gradient(density), axis=-1)
+
+        self.vectors = towards - slope * self.crowding
+
+    # Direction for ship to sail in, straight for the player outside the field
+    def heading(self, ship):
+        cell = np.floor((np.array([ship.position.x, ship.position.y]) - self.origin) / self.cell_size).astype(int)
+        if np.any(cell < 0) or np.any(cell >= self.size):
+            direction = self.player.position + self.player.facing - ship.position
+        else:
+            direction = ppb.Vector(*self.vectors[cell[0], cell[1]].tolist())
+        return direction + self.push(ship) * self.separation
+
+    # Away from every ship overlapping this one, more the deeper the overlap
+    def push(self, ship):
+        push = ppb.Vector(0, 0)
+        for other in ship_index(self.event.scene).query(ship.position, ship.size):
+            if other is ship or other is self.player:
+                continue
+            offset = ship.position - other.position
+            distance = offset.length
+            overlap = (ship.size + other.size) / 2 - distance
+            if overlap > 0 and distance > 1e-9:
+                push += offset * (overlap / distance)
+        return push
+
+
+def flow_field(scene):
+    field = getattr(scene, "flow_field", None)
+    if field is None:
+        field = scene.flow_field = FlowField(config.flow_field_size, config.flow_field_cell_size)
+    return field
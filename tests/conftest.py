@@ -0,0 +1,48 @@
+import os
+import sys
+
+import ppb
+import pytest
+from ppb import events
+from ppb.assetlib import AssetLoadingSystem
+from ppb.systemslib import System
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The game is a flat set of modules that load their assets relative to the repository
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+# Windows and sound go to SDL's dummy drivers
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from renderer import GameRenderer  # noqa: E402
+from scenes import GameScene  # noqa: E402
+
+
+# Quits after a number of frames, calling on_frame(scene) on each
+class RenderProbe(System):
+    def __init__(self, *, frames, on_frame, **kwargs):
+        super().__init__()
+        self.frames = frames
+        self.on_frame = on_frame
+        self.rendered = 0
+
+    def on_render(self, render_event, signal):
+        self.rendered += 1
+        self.on_frame(render_event.scene)
+        if self.rendered == self.frames:
+            signal(events.Quit())
+
+
+# Draws frames of a scene set up by setup(scene) with the game's renderer. There is no clock, so
+# nothing moves in between. Returns the number of frames drawn.
+@pytest.fixture
+def render_frames():
+    def render(setup, frames=5, on_frame=lambda scene: None):
+        probe = RenderProbe(frames=frames, on_frame=on_frame)
+        engine = ppb.make_engine(setup, starting_scene=GameScene, title="test",
+                                 basic_systems=(GameRenderer, AssetLoadingSystem), systems=(probe,))
+        with engine:
+            engine.run()
+        return probe.rendered
+    return render
@@ -0,0 +1,12 @@
+import ppb
+
+import activity
+from scenes import GameScene
+
+
+def test_catch_up_updates_belong_to_the_tick_they_were_made_in():
+    tick = ppb.events.Update(time_delta=1 / 30, scene=GameScene())
+    catch_up = activity.ActivitySystem().coarse_event(tick, 0.2)
+    assert catch_up.time_delta == 0.2
+    assert activity.origin(catch_up) is tick
+    assert activity.origin(tick) is tick
@@ -0,0 +1,29 @@
+import ppb
+
+import main
+import ships
+from effects import particle_emitter
+
+
+def test_scene_with_particles_renders(render_frames):
+    def setup(scene):
+        wind = scene.add(main.Wind())
+        scene.add(ships.Player(position=ppb.Vector(0, 0), wind=wind, facing=ppb.directions.Up))
+        emitter = particle_emitter(scene)
+        emitter.emit("splash", ppb.Vector(1, 1))
+        emitter.emit_many("wake", [(0, -1), (0.5, -1), (40, 40)])
+
+    live = []
+    assert render_frames(setup, on_frame=lambda scene: live.append(len(particle_emitter(scene)))) == 5
+    assert live == [4] * 5
+
+
+def test_emitter_drops_finished_particles():
+    emitter = particle_emitter(ppb.Scene())
+    emitter.emit("explosion", ppb.Vector(0, 0))
+    emitter.emit("splash", ppb.Vector(0, 0), size=2)
+    frames, positions, sizes, rotations = emitter.__particles__(ppb.camera.Camera(None, 25, (800, 600)))
+    assert sizes.tolist() == [1, 2]
+
+    emitter.on_update(ppb.events.Update(1.5), None)
+    assert len(emitter) == 0
@@ -0,0 +1,38 @@
+import math
+
+import ppb
+from ppb.camera import Camera
+
+from labels import IndicatorManager
+
+
+def target(angle, distance):
+    ang_in_rad = math.radians(angle)
+    return ppb.Sprite(position=ppb.Vector(math.cos(ang_in_rad), math.sin(ang_in_rad)) * distance, size=1)
+
+
+def chosen(manager):
+    return [t for t, _ in manager.bearings(Camera(None, 25, (800, 600)))]
+
+
+def manager_for(targets):
+    manager = IndicatorManager(player=ppb.Sprite(position=ppb.Vector(0, 0)))
+    manager.merge_angle = 6
+    for t in targets:
+        manager.track(t)
+    return manager
+
+
+def test_flag_skipped_for_a_close_bearing_does_not_hide_others_next_to_it():
+    # 7 and 11.5 degrees fall in the same 6 degree sector, the nearer one is too close to the flag
+    # at 5 degrees but the farther one is far enough from it to get its own
+    first, too_close, next_along = target(5, 30), target(7, 31), target(11.5, 32)
+    assert chosen(manager_for([next_along, too_close, first])) == [first, next_along]
+
+
+def test_closest_targets_get_the_flags_up_to_the_cap():
+    targets = [target(angle, 30 + angle / 10) for angle in range(0, 360, 10)]
+    on_screen = target(0, 2)
+    manager = manager_for([*reversed(targets), on_screen])
+    manager.max_indicators = 4
+    assert chosen(manager) == targets[:4]
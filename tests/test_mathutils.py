@@ -0,0 +1,77 @@
+import math
+import random
+
+import numpy as np
+import ppb
+import pytest
+from ppb.camera import Camera
+
+from mathutils import (TrigTable, angle_between_a_b, angles_between, as_array, camera_contains, dot_product,
+                       dot_product_as_cos, dot_products, dot_products_as_cos, lerp_vector, lerp_vectors,
+                       rotated_vector, rotated_vector_lut, rotated_vectors)
+
+
+def random_vectors(seed, count=50):
+    random = np.random.default_rng(seed)
+    return [ppb.Vector(*random.uniform(-10, 10, 2).tolist()) for _ in range(count)]
+
+
+def assert_matches(array, vectors):
+    assert array == pytest.approx(as_array(vectors))
+
+
+def test_camera_contains_agrees_for_vectors_and_arrays():
+    camera = Camera(None, 20, (800, 600))
+    camera.position = ppb.Vector(5, 0)
+    points = [ppb.Vector(5, 0), ppb.Vector(15.4, 0), ppb.Vector(15.6, 0), ppb.Vector(5, -7.6), ppb.Vector(-6, 9)]
+    expected = [True, True, False, True, False]
+    assert [camera_contains(camera, p, 1) for p in points] == expected
+    array = np.array([(p.x, p.y) for p in points])
+    assert camera_contains(camera, array, np.ones(len(points))).tolist() == expected
+
+
+def test_rotated_vectors_match_rotated_vector():
+    vectors = random_vectors(1)
+    angles = np.random.default_rng(2).uniform(-360, 360, len(vectors))
+    assert_matches(rotated_vectors(as_array(vectors), angles),
+                   [rotated_vector(v, a) for v, a in zip(vectors, angles.tolist())])
+    assert_matches(rotated_vectors(as_array(vectors), 90), [rotated_vector(v, 90) for v in vectors])
+
+
+def test_dot_products_match_dot_product():
+    a, b = random_vectors(3), random_vectors(4)
+    assert dot_products(as_array(a), as_array(b)).tolist() == pytest.approx(
+        [dot_product(u, v) for u, v in zip(a, b)])
+    assert dot_products_as_cos(as_array(a), as_array(b)).tolist() == pytest.approx(
+        [dot_product_as_cos(u, v) for u, v in zip(a, b)])
+    assert angles_between(as_array(a), as_array(b)).tolist() == pytest.approx(
+        [angle_between_a_b(u, v) for u, v in zip(a, b)])
+
+
+def test_dot_products_as_cos_is_zero_for_zero_vectors():
+    cosines = dot_products_as_cos(np.array([(0, 0), (1, 0), (3, 4)]), np.array([(1, 0), (0, 0), (3, 4)]))
+    assert cosines.tolist() == pytest.approx([0, 0, 1])
+
+
+def test_lerp_vectors_match_lerp_vector():
+    a, b = random_vectors(5), random_vectors(6)
+    factors = np.random.default_rng(7).uniform(0, 1, len(a))
+    assert_matches(lerp_vectors(as_array(a), as_array(b), factors),
+                   [lerp_vector(u, v, t) for u, v, t in zip(a, b, factors.tolist())])
+    assert_matches(lerp_vectors(as_array(a), as_array(b), 0.25), [lerp_vector(u, v, 0.25) for u, v in zip(a, b)])
+
+
+def test_trig_table_matches_math_on_and_off_its_steps():
+    table = TrigTable(step=15)
+    for angle in [*range(-360, 361, 15), 7, -100, 400]:
+        c, s = table.lookup(angle)
+        assert (c, s) == pytest.approx((math.cos(math.radians(angle)), math.sin(math.radians(angle))))
+
+
+def test_rotated_vector_lut_matches_rotated_vector():
+    random.seed(8)
+    for vector in random_vectors(9):
+        angle = random.choice([-90, 90, 15, -15, 180, 7.5])
+        lut = rotated_vector_lut(vector, angle)
+        exact = rotated_vector(vector, angle)
+        assert (lut.x, lut.y) == pytest.approx((exact.x, exact.y))
@@ -0,0 +1,25 @@
+from pools import Pool
+
+
+class Thing:
+    def reset(self, **props):
+        self.__dict__.update(props)
+
+
+def test_released_objects_are_reused_last_in_first_out():
+    pool = Pool(Thing, capacity=4)
+    a, b = pool.acquire(), pool.acquire()
+    pool.release(a)
+    pool.release(b)
+    assert pool.acquire(name="b") is b
+    assert b.name == "b"
+    assert pool.stats()["hits"] == 1
+
+
+def test_releasing_twice_does_not_hand_out_duplicates():
+    pool = Pool(Thing, capacity=4)
+    thing = pool.acquire()
+    pool.release(thing)
+    pool.release(thing)
+    assert pool.acquire() is thing
+    assert pool.acquire() is not thing
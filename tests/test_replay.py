@@ -0,0 +1,44 @@
+from ppb import events, keycodes
+from ppb.systemslib import System
+
+import headless
+import replay
+
+
+# Presses and releases keys at fixed ticks, like a player would
+class KeyScript(System):
+    script = {
+        10: (events.KeyPressed, keycodes.Left),
+        40: (events.KeyReleased, keycodes.Left),
+        60: (events.KeyPressed, keycodes.E),
+        61: (events.KeyReleased, keycodes.E),
+        90: (events.KeyPressed, keycodes.Right),
+        200: (events.KeyPressed, keycodes.Q),
+        201: (events.KeyReleased, keycodes.Q),
+        250: (events.KeyReleased, keycodes.Right),
+    }
+
+    def __init__(self, **kwargs):
+        super().__init__()
+        self.tick = 0
+
+    def on_update(self, update_event, signal):
+        self.tick += 1
+        if self.tick in self.script:
+            kind, key = self.script[self.tick]
+            signal(kind(key=key, mods=set()))
+
+
+def test_replay_reproduces_the_recorded_game(tmp_path):
+    path = str(tmp_path / "game.bjr")
+    recorder = replay.Recorder(path=path, seed=11)
+    report = headless.run(ticks=400, time_delta=1 / 30, seed=11, systems=(recorder, KeyScript()))
+
+    recorded = replay.Replay.load(path)
+    assert recorded.ticks == 400
+    assert len(recorded.key_events) == len(KeyScript.script)
+    assert recorded.digest == report["state"]["digest"]
+
+    result = replay.play(path, realtime=False)
+    assert result["matches"]
+    assert result["state"]["digest"] == report["state"]["digest"]
@@ -0,0 +1,45 @@
+import ppb
+
+from scenes import GameScene
+
+
+class Boat(ppb.Sprite):
+    tags = ("floats", )
+
+
+class Dinghy(Boat):
+    pass
+
+
+def test_children_are_found_by_class_and_tag_in_the_order_added():
+    scene = GameScene()
+    boat = scene.add(Boat())
+    dinghy = scene.add(Dinghy(), tags=("small", ))
+    rock = scene.add(ppb.Sprite())
+    assert list(scene.get(kind=Boat)) == [boat, dinghy]
+    assert list(scene.get(tag="floats")) == [boat, dinghy]
+    assert list(scene.get(kind=ppb.Sprite, tag="small")) == [dinghy]
+    assert scene.count(kind=ppb.Sprite) == 3
+
+    scene.remove(boat)
+    assert list(scene.get(kind=Boat)) == [dinghy]
+    assert scene.count(tag="floats") == 1
+    assert list(scene.get(kind=ppb.Sprite)) == [dinghy, rock]
+
+
+def test_classes_with_the_same_name_are_kept_apart():
+    Other = type("Boat", (ppb.Sprite, ), {})
+    scene = GameScene()
+    boat, other = scene.add(Boat()), scene.add(Other())
+    assert list(scene.get(kind=Boat)) == [boat]
+    assert list(scene.get(kind=Other)) == [other]
+
+
+def test_count_watchers_hear_about_subclasses():
+    scene = GameScene()
+    calls = []
+    scene.watch_count(Boat, lambda: calls.append(scene.count(kind=Boat)))
+    dinghy = scene.add(Dinghy())
+    scene.add(ppb.Sprite())
+    scene.remove(dinghy)
+    assert calls == [1, 0]
@@ -0,0 +1,75 @@
+import math
+import random
+
+import ppb
+from ppb.gomlib import GameObject
+
+import bench
+import headless
+import ships
+from mathutils import segment_circle_entry
+from weapons import ProjectileSystem, projectile_system
+
+
+# Keeps the player firing in every direction, enemies don't hit each other
+class Battery(GameObject):
+    balls = 40
+
+    def __init__(self, **props):
+        super().__init__(**props)
+        self.random = random.Random(3)
+
+    def on_update(self, update_event, signal):
+        scene = update_event.scene
+        player = next(scene.get(kind=ships.Player))
+        system = projectile_system(scene)
+        while len(system) < self.balls:
+            angle = self.random.random() * math.tau
+            direction = ppb.Vector(math.cos(angle), math.sin(angle)) * 4
+            system.launch(scene, shooter=player, position=player.position, direction=direction,
+                          range=8, damage=0.1)
+
+
+def battle(scene):
+    bench.bench_setup(scene, enemies=60, balls=0)
+    scene.add(Battery())
+
+
+# The ships every ball's path enters first, checked against every ship in the scene. More than one
+# when a ball starts inside overlapping ships.
+def brute_force_hits(system, scene, start, end):
+    hits = {}
+    fleet = list(scene.get(kind=ships.Ship))
+    for i, ((x0, y0), (x1, y1)) in enumerate(zip(start.tolist(), end.tolist())):
+        shooter = system.balls[i].shooter
+        entries = {}
+        for ship in fleet:
+            if ship == shooter or isinstance(ship, type(shooter)):
+                continue
+            t = segment_circle_entry(x0, y0, x1 - x0, y1 - y0, ship.position.x, ship.position.y, ship.size)
+            if t is not None:
+                entries[ship] = t
+        if entries:
+            first_t = min(entries.values())
+            hits[i] = {ship for ship, t in entries.items() if t == first_t}
+    return hits
+
+
+def test_spatial_hash_finds_the_same_hits_as_brute_force(monkeypatch):
+    collide = ProjectileSystem.collide
+    checked = []
+
+    def checked_collide(self, scene, start):
+        expected = brute_force_hits(self, scene, start, self.position[:self.count].copy())
+        hits = collide(self, scene, start)
+        assert hits.keys() == expected.keys()
+        assert all(ship in expected[i] for i, ship in hits.items())
+        checked.append(len(hits))
+        return hits
+
+    monkeypatch.setattr(ProjectileSystem, "collide", checked_collide)
+    # Long steps, so ball paths cross cells
+    headless.run(ticks=300, time_delta=0.25, seed=5, setup=battle)
+    # Every tick after the first had balls in flight
+    assert len(checked) == 299
+    assert sum(checked) > 50, sum(checked)
@@ -0,0 +1,38 @@
+import itertools
+import random
+
+import ppb
+import pytest
+
+import config
+import headless
+import main
+import ships
+from spawning import SpawnSampler
+
+
+def assert_apart(circles):
+    for (a, ra), (b, rb) in itertools.combinations(circles, 2):
+        assert (a - b).length >= ra + rb
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_arena_ships_never_overlap(seed, monkeypatch):
+    monkeypatch.setattr(config, "number_of_enemies", 60)
+    result = {}
+
+    def setup(scene):
+        main.setup(scene)
+        result["scene"] = scene
+
+    headless.run(ticks=0, seed=seed, setup=setup)
+    fleet = list(result["scene"].get(kind=ships.Ship))
+    assert len(fleet) == 61
+    assert_apart([(ship.position, ship.size) for ship in fleet])
+
+
+def test_full_rings_are_widened_instead_of_overlapping():
+    spawns = SpawnSampler(random.Random(1))
+    spawns.reserve(ppb.Vector(0, 0), 1)
+    circles = [(ppb.Vector(0, 0), 1)] + [(spawns.place(2, 3, 1), 1) for _ in range(40)]
+    assert_apart(circles)
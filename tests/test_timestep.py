@@ -0,0 +1,25 @@
+import ppb
+from ppb.camera import Camera
+
+from scenes import GameScene
+from timestep import INTERPOLATED, Interpolation
+
+
+class Mover(ppb.Sprite):
+    tags = (INTERPOLATED, )
+
+
+def test_snapshot_takes_only_moving_sprites():
+    scene = GameScene()
+    scene.main_camera = Camera(None, 25, (800, 600))
+    mover = scene.add(Mover(position=ppb.Vector(0, 0)))
+    still = scene.add(ppb.Sprite(position=ppb.Vector(5, 5)))
+    interpolation = Interpolation()
+    interpolation.snapshot(scene)
+    assert list(interpolation.previous) == [mover]
+
+    mover.position = ppb.Vector(0.5, 0)
+    still.position = ppb.Vector(5, 6)
+    interpolation.alpha = 0.5
+    assert interpolation.position(mover) == ppb.Vector(0.25, 0)
+    assert interpolation.position(still) == ppb.Vector(5, 6)
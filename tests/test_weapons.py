@@ -0,0 +1,38 @@
+import ppb
+
+import headless
+import main
+import ships
+from weapons import projectile_system
+
+
+def test_scene_with_balls_in_flight_renders(render_frames):
+    def setup(scene):
+        wind = scene.add(main.Wind())
+        player = scene.add(ships.Player(position=ppb.Vector(0, 0), wind=wind, facing=ppb.directions.Up))
+        projectile_system(scene).launch(scene, shooter=player, position=ppb.Vector(0.5, 0),
+                                        direction=ppb.Vector(1, 0), range=20, damage=0.5)
+
+    flying = []
+    assert render_frames(setup, on_frame=lambda scene: flying.append(len(projectile_system(scene)))) == 5
+    assert all(flying)
+
+
+def test_shooters_are_released_when_their_balls_are_retired():
+    result = {}
+
+    def setup(scene):
+        wind = scene.add(main.Wind())
+        system = projectile_system(scene)
+        for x in range(3):
+            shooter = ships.Enemy(position=ppb.Vector(x * 3, 10), wind=wind)
+            system.launch(scene, shooter=shooter, position=shooter.position, direction=ppb.Vector(1, 0),
+                          range=1, damage=0.5)
+            shooter.projectiles_flying += 1
+        result["scene"] = scene
+
+    headless.run(ticks=120, setup=setup)
+    system = projectile_system(result["scene"])
+    assert len(system) == 0
+    assert system.shooter_ids == {}
+    assert system.shooters == [None] * 3
@@ -0,0 +1,42 @@
+import numpy as np
+import ppb
+import pytest
+
+from windfield import WindField
+
+
+def field():
+    wind = WindField(size=4, cell_size=2.0, seed=1)
+    wind.build(ppb.Vector(1, 0), 1.5)
+    return wind
+
+
+def test_samples_at_nodes_are_the_node_vectors():
+    wind = field()
+    nodes = [(x, y) for x in range(4) for y in range(4)]
+    samples = wind.sample([(x * 2.0, y * 2.0) for x, y in nodes])
+    assert samples == pytest.approx(np.array([wind.vectors[x, y] for x, y in nodes]))
+
+
+def test_samples_between_nodes_average_them():
+    wind = field()
+    v = wind.vectors
+    midpoints = wind.sample([(3.0, 2.0), (2.0, 3.0), (3.0, 3.0)])
+    assert midpoints[0] == pytest.approx((v[1, 1] + v[2, 1]) / 2)
+    assert midpoints[1] == pytest.approx((v[1, 1] + v[1, 2]) / 2)
+    assert midpoints[2] == pytest.approx((v[1, 1] + v[2, 1] + v[1, 2] + v[2, 2]) / 4)
+
+
+def test_field_wraps_around_its_edges():
+    wind = field()
+    v = wind.vectors
+    extent = 4 * 2.0
+    # Halfway from the last node back to the first one, and the same spots a whole field away
+    across = wind.sample([(7.0, 0.0), (0.0, 7.0), (7.0, 7.0)])
+    assert across[0] == pytest.approx((v[3, 0] + v[0, 0]) / 2)
+    assert across[1] == pytest.approx((v[0, 3] + v[0, 0]) / 2)
+    assert across[2] == pytest.approx((v[3, 3] + v[0, 3] + v[3, 0] + v[0, 0]) / 4)
+    points = np.array([(0.5, 1.25), (7.5, 6.0), (3.3, 7.9)])
+    expected = wind.sample(points)
+    for shift in [(extent, 0), (0, -extent), (-3 * extent, 2 * extent)]:
+        assert wind.sample(points + shift) == pytest.approx(expected)
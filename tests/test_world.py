@@ -0,0 +1,54 @@
+import itertools
+
+import numpy as np
+import ppb
+from ppb.camera import Camera
+
+import main
+import rng
+import ships
+from labels import indicator_manager
+from scenes import GameScene
+from world import ENEMY, RECORD, World
+
+
+def make_world():
+    rng.seed(0)
+    scene = GameScene()
+    scene.main_camera = Camera(None, 25, (800, 600))
+    wind = scene.add(main.Wind())
+    player = scene.add(ships.Player(position=ppb.Vector(0, 0), wind=wind, facing=ppb.directions.Up))
+    world = scene.add(World(player=player, wind=wind))
+    return scene, world
+
+
+def spawned(scene):
+    return [*scene.get(kind=ships.Enemy), *scene.get(kind=ships.Flotsam)]
+
+
+def test_generated_chunk_avoids_ships_stored_in_it():
+    scene, world = make_world()
+    size = world.chunk_size
+    # A chunk that was never generated, crowded with ships that sailed into it
+    records = [(ENEMY, 0, 1, size + x, y, 0, 0, 2, 1, 1, 0, 0)
+               for x, y in itertools.product(np.arange(1.5, size, 3.5), repeat=2)]
+    world.stored[(1, 0)] = np.array(records, dtype=RECORD).tobytes()
+    world.load(scene, (1, 0))
+
+    objects = spawned(scene)
+    assert len(objects) > len(records)
+    for a, b in itertools.combinations(objects, 2):
+        assert (a.position - b.position).length >= a.size + b.size
+
+
+def test_flotsam_keeps_its_indicator_through_unloading():
+    scene, world = make_world()
+    flotsam = ships.Flotsam(position=ppb.Vector(world.chunk_size * 5, 0))
+    world.add(scene, flotsam)
+    world.unload_distant(scene, (0, 0))
+    assert not list(scene.get(kind=ships.Flotsam))
+
+    world.load(scene, (5, 0))
+    restored = [f for f in scene.get(kind=ships.Flotsam) if f.position == flotsam.position]
+    assert len(restored) == 1
+    assert restored[0] in indicator_manager(scene).targets
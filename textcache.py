@@ -0,0 +1,159 @@
+import ctypes
+from collections import OrderedDict
+
+import ppb
+from ppb.assetlib import AbstractAsset, ChainingMixin, FreeingMixin
+from ppb.systems.sdl_utils import sdl_call, ttf_call
+from ppb.systems.text import _freetype_lock
+from sdl2 import (
+    SDL_BLENDMODE_BLEND,
+    SDL_BLENDMODE_NONE,
+    SDL_PIXELFORMAT_RGBA32,
+    SDL_BlitSurface,
+    SDL_Color,
+    SDL_CreateRGBSurfaceWithFormat,
+    SDL_FreeSurface,
+    SDL_Rect,
+    SDL_SetSurfaceBlendMode,
+)
+from sdl2.sdlttf import TTF_RenderUTF8_Blended, TTF_SizeUTF8
+
+import config
+
+WHITE = (255, 255, 255)
+NUMERIC_GLYPHS = " 0123456789.-+"
+
+
+class LRUCache:
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, factory):
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            value = self.entries[key] = factory()
+            if len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return value
+
+
+def _text_width(font, txt):
+    if not txt:
+        return 0
+    w, h = ctypes.c_int(), ctypes.c_int()
+    ttf_call(TTF_SizeUTF8, font, txt.encode('utf-8'), ctypes.byref(w), ctypes.byref(h),
+             _check_error=lambda rv: rv < 0)
+    return w.value
+
+
+# All glyphs of a small alphabet rasterized once into one surface, plus where each glyph sits in it
+class GlyphAtlas(ChainingMixin, FreeingMixin, AbstractAsset):
+    def __init__(self, font, *, color=WHITE, glyphs=NUMERIC_GLYPHS):
+        self.font = font
+        self.color = color
+        self.glyphs = glyphs
+
+        self._start(self.font)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} glyphs={self.glyphs!r} font={self.font!r} color={self.color!r}>"
+
+    def __contains__(self, txt):
+        return all(c in self.glyphs for c in txt)
+
+    def _background(self):
+        with _freetype_lock:
+            font = self.font.load()
+            surface = ttf_call(
+                TTF_RenderUTF8_Blended, font, self.glyphs.encode('utf-8'), SDL_Color(*self.color),
+                _check_error=lambda rv: not rv
+            )
+            offsets = [_text_width(font, self.glyphs[:i]) for i in range(len(self.glyphs) + 1)]
+        # Copy glyph pixels verbatim when composing, blending onto an empty surface loses alpha
+        sdl_call(SDL_SetSurfaceBlendMode, surface, SDL_BLENDMODE_NONE, _check_error=lambda rv: rv < 0)
+        height = surface.contents.h
+        rects = {
+            glyph: SDL_Rect(offsets[i], 0, offsets[i + 1] - offsets[i], height)
+            for i, glyph in enumerate(self.glyphs)
+        }
+        return surface, rects
+
+    def free(self, data, _SDL_FreeSurface=SDL_FreeSurface):
+        _SDL_FreeSurface(data[0])
+
+
+# Text composed by copying glyphs out of a GlyphAtlas, no font rasterization involved
+class GlyphText(ChainingMixin, FreeingMixin, AbstractAsset):
+    def __init__(self, txt, *, atlas):
+        self.txt = txt
+        self.atlas = atlas
+
+        self._start(self.atlas)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} txt={self.txt!r} atlas={self.atlas!r}>"
+
+    def _background(self):
+        atlas, rects = self.atlas.load()
+        glyph_rects = [rects[c] for c in self.txt]
+        width = max(1, sum(r.w for r in glyph_rects))
+        surface = sdl_call(
+            SDL_CreateRGBSurfaceWithFormat, 0, width, atlas.contents.h, 32, SDL_PIXELFORMAT_RGBA32,
+            _check_error=lambda rv: not rv
+        )
+        x = 0
+        for r in glyph_rects:
+            sdl_call(
+                SDL_BlitSurface, atlas, ctypes.byref(r), surface, ctypes.byref(SDL_Rect(x, 0, r.w, r.h)),
+                _check_error=lambda rv: rv < 0
+            )
+            x += r.w
+        sdl_call(SDL_SetSurfaceBlendMode, surface, SDL_BLENDMODE_BLEND, _check_error=lambda rv: rv < 0)
+        return surface
+
+    def free(self, surface, _SDL_FreeSurface=SDL_FreeSurface):
+        _SDL_FreeSurface(surface)
+
+
+fonts = {}
+atlases = {}
+texts = LRUCache(config.text_cache_size)
+
+
+def font(name, size):
+    key = (name, size)
+    f = fonts.get(key)
+    if f is None:
+        f = fonts[key] = ppb.Font(name, size=size)
+    return f
+
+
+def glyph_atlas(font, color=WHITE):
+    key = (font.name, font.size, color)
+    atlas = atlases.get(key)
+    if atlas is None:
+        atlas = atlases[key] = GlyphAtlas(font, color=color)
+    return atlas
+
+
+def text(txt, font, color=WHITE):
+    return texts.get((txt, font.name, font.size, color), lambda: ppb.Text(txt, font=font, color=color))
+
+
+def numeric_text(txt, font, color=WHITE):
+    # Short, often changing HUD numbers are stitched from the glyph atlas
+    atlas = glyph_atlas(font, color)
+    if len(txt) > config.glyph_text_max_length or txt not in atlas:
+        return text(txt, font, color)
+    return texts.get((txt, font.name, font.size, color), lambda: GlyphText(txt, atlas=atlas))
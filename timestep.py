@@ -0,0 +1,89 @@
+import ppb
+from ppb import events
+from ppb.systemslib import System
+
+import config
+
+
+# Sprites that move on their own carry this tag. Everything else is drawn where it is.
+INTERPOLATED = "interpolated"
+
+
+# Where the moving sprites and the camera were before the last simulation step. The renderer draws
+# them alpha of the way from there to where they are now, one step behind the simulation.
+class Interpolation:
+    # Moving farther than this in one step is a jump, e.g. a pooled sprite that got reused
+    max_distance = 1.0
+
+    def __init__(self):
+        self.previous = {}
+        self.camera = None
+        self.alpha = 1.0
+
+    def snapshot(self, scene):
+        self.previous = {sprite: (sprite.position, sprite.rotation) for sprite in scene.get(tag=INTERPOLATED)}
+        self.camera = scene.main_camera.position
+
+    def between(self, before, now):
+        if before is None or (now - before).length > self.max_distance:
+            return now
+        return before + (now - before) * self.alpha
+
+    def position(self, sprite):
+        before = self.previous.get(sprite)
+        return self.between(None if before is None else before[0], sprite.position)
+
+    def rotation(self, sprite):
+        before = self.previous.get(sprite)
+        if before is None:
+            return sprite.rotation
+        turn = (sprite.rotation - before[1] + 180) % 360 - 180
+        return before[1] + turn * self.alpha
+
+    def camera_position(self, camera):
+        return self.between(self.camera, camera.position)
+
+
+def interpolation(scene):
+    state = getattr(scene, "interpolation", None)
+    if state is None:
+        state = scene.interpolation = Interpolation()
+    return state
+
+
+# Runs the simulation in fixed steps of 1 / simulation_rate seconds, however fast frames are drawn.
+# Time is accumulated and spent in whole steps; after a stall at most max_steps are run at once
+# and the rest is dropped, so the game slows down instead of spending every frame catching up.
+class SimulationClock(System):
+    def __init__(self, *, simulation_rate=None, max_steps=None, **kwargs):
+        super().__init__()
+        self.time_step = 1 / (simulation_rate or config.simulation_rate)
+        self.max_steps = max_steps or config.max_simulation_steps
+        self.last_tick = None
+        # Real time the simulation may use up, time already handed out in steps and steps done
+        self.budget = 0.0
+        self.scheduled = 0.0
+        self.simulated = 0.0
+
+    def on_idle(self, idle_event, signal):
+        now = ppb.get_time()
+        if self.last_tick is None:
+            self.last_tick = now
+        self.budget += now - self.last_tick
+        self.last_tick = now
+        steps = int((self.budget - self.scheduled) / self.time_step)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.budget = self.scheduled + steps * self.time_step
+        for _ in range(steps):
+            signal(events.Update(self.time_step))
+        self.scheduled += steps * self.time_step
+
+    def on_update(self, update_event, signal):
+        # Systems see the update before anything in the scene moves
+        interpolation(update_event.scene).snapshot(update_event.scene)
+        self.simulated += update_event.time_delta
+
+    def on_pre_render(self, event, signal):
+        alpha = (self.budget - self.simulated) / self.time_step
+        interpolation(event.scene).alpha = min(max(alpha, 0.0), 1.0)
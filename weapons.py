@@ -1,47 +1,199 @@
-from math import sqrt
-
+import numpy as np
 import ppb as ppb
+from ppb.gomlib import GameObject
 
-from effects import Splash, Explosion
-import ships
+import pools
+import resources
+from effects import particle_emitter
+from mathutils import segment_circle_entry
+from spatial import ship_index
+from timestep import INTERPOLATED
 
 
 class CannonBall(ppb.Sprite):
+    tags = (INTERPOLATED, )
     shooter = None
     size = 0.25
     drag = 0.5
+    max_size = 1.2
     direction = None
     damage = 0.5
-    image = ppb.Image("assets/sprites/Default size/Ship parts/cannonBall.png")
+    image = resources.image("assets/sprites/Default size/Ship parts/cannonBall.png")
     range = None
-    last_position = None
+
+    def reset(self, **props):
+        for k, v in props.items():
+            setattr(self, k, v)
+
+
+# Steps every ball in flight at once. Per-ball state lives in parallel arrays, the
+# CannonBall sprites are only written to when a ball moved, grew or has to go.
+class ProjectileSystem(GameObject):
+    stall_distance = 0.01
+    fields = (
+        ("position", (2,), float),
+        ("velocity", (2,), float),
+        ("range", (), float),
+        ("damage", (), float),
+        # Not "size": the system is a scene child and the renderer reads size off every child
+        ("sizes", (), float),
+        ("shooter", (), np.intp),
+        ("has_moved", (), bool),
+    )
+
+    def __init__(self, capacity=64, **props):
+        super().__init__(**props)
+        self.count = 0
+        self.capacity = 0
+        self.balls = []
+        # Ships with balls in flight by id, and how many. A ship's id is freed for reuse when its
+        # last ball is retired, so ships that are gone aren't kept around.
+        self.shooters = []
+        self.shooter_ids = {}
+        self.in_flight = []
+        self.free_ids = []
+        self.resize(capacity)
+
+    def __len__(self):
+        return self.count
+
+    def resize(self, capacity):
+        for name, shape, dtype in self.fields:
+            array = np.zeros((capacity,) + shape, dtype=dtype)
+            if self.count:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def shooter_id(self, shooter):
+        sid = self.shooter_ids.get(shooter)
+        if sid is None:
+            if self.free_ids:
+                sid = self.free_ids.pop()
+                self.shooters[sid] = shooter
+            else:
+                sid = len(self.shooters)
+                self.shooters.append(shooter)
+                self.in_flight.append(0)
+            self.shooter_ids[shooter] = sid
+        return sid
+
+    def launch(self, scene, shooter, position, direction, range, damage):
+        if self.count == self.capacity:
+            self.resize(self.capacity * 2)
+        ball = scene.add(pools.acquire(CannonBall, shooter=shooter, position=position, direction=direction,
+                                       range=range, damage=damage, size=CannonBall.size))
+        i = self.count
+        self.position[i] = position.x, position.y
+        self.velocity[i] = direction.x, direction.y
+        self.range[i] = range
+        self.damage[i] = damage
+        self.sizes[i] = ball.size
+        self.shooter[i] = sid = self.shooter_id(shooter)
+        self.in_flight[sid] += 1
+        self.has_moved[i] = False
+        self.balls.append(ball)
+        self.count += 1
+        return ball
 
     def on_update(self, update_event, signal):
-        movement = self.direction * update_event.time_delta
-        self.position += movement
-        self.range -= movement.length
-        self.direction -= self.direction*self.drag*update_event.time_delta
-        self.size = min(self.range * 0.1 + self.damage/2, 1.2)
-        if self.last_position is not None and self.position.isclose(self.last_position, abs_tol=0.01):
-            self.range = -1
-        if self.range <= 0:
-            update_event.scene.add(Splash(position=self.position))
-            self.shooter.projectiles_flying -= 1
-            try:
-                update_event.scene.remove(self)
-            except:
-                ...
-        self.last_position = self.position
-
-        # Detect collision between Projectile and Ship
-        for p in update_event.scene.get(kind=ships.Ship):
-            if p == self.shooter or isinstance(p, type(self.shooter)):
+        if not self.count:
+            return
+        start = self.position[:self.count].copy()
+        changed, expired = self.step(update_event.time_delta)
+        hits = self.collide(update_event.scene, start)
+        for i in np.flatnonzero(changed).tolist():
+            ball = self.balls[i]
+            ball.position = ppb.Vector(*self.position[i].tolist())
+            ball.size = float(self.sizes[i])
+        self.retire(update_event.scene, expired, hits)
+
+    def step(self, time_delta):
+        n = self.count
+        position = self.position[:n]
+        velocity = self.velocity[:n]
+        range_left = self.range[:n]
+        size = self.sizes[:n]
+
+        movement = velocity * time_delta
+        position += movement
+        distance = np.hypot(movement[:, 0], movement[:, 1])
+        range_left -= distance
+        velocity -= velocity * CannonBall.drag * time_delta
+        new_size = np.minimum(range_left * 0.1 + self.damage[:n] / 2, CannonBall.max_size)
+        changed = (distance > 0) | (new_size != size)
+        size[:] = new_size
+
+        # A ball that no longer moves is dropped into the water
+        range_left[self.has_moved[:n] & (distance <= self.stall_distance)] = -1
+        self.has_moved[:n] = True
+        return changed, range_left <= 0
+
+    # A ball hits the first ship whose circle its path since start enters, so fast balls and long
+    # time steps don't pass through ships. Balls that hit are moved back to where they hit.
+    def collide(self, scene, start):
+        index = ship_index(scene)
+        end = self.position[:self.count]
+        hits = {}
+        for i, ((x0, y0), (x1, y1)) in enumerate(zip(start.tolist(), end.tolist())):
+            nearby = index.query_segment(x0, y0, x1, y1)
+            if not nearby:
                 continue
-            if (p.position - self.position).length <= p.size:
-                print(f"Hit {p} at {p.position} with damage {self.damage}")
-                update_event.scene.add(Explosion(position=self.position))
-                self.shooter.projectiles_flying -= 1
-                update_event.scene.remove(self)
-                p.take_damage(self)
+            ball = self.balls[i]
+            dx, dy = x1 - x0, y1 - y0
+            first, first_t = None, None
+            for p in nearby:
+                if p == ball.shooter or isinstance(p, type(ball.shooter)):
+                    continue
+                t = segment_circle_entry(x0, y0, dx, dy, p.position.x, p.position.y, p.size)
+                if t is not None and (first_t is None or t < first_t):
+                    first, first_t = p, t
+            if first is not None:
+                hits[i] = first
+                end[i] = x0 + dx * first_t, y0 + dy * first_t
+        return hits
+
+    def retire(self, scene, expired, hits):
+        done = expired.copy()
+        done[list(hits)] = True
+        if not done.any():
+            return
+
+        for i in np.flatnonzero(done).tolist():
+            ball = self.balls[i]
+            p = hits.get(i)
+            if p is None:
+                particle_emitter(scene).emit("splash", ball.position)
+            else:
+                print(f"Hit {p} at {p.position} with damage {ball.damage}")
+                particle_emitter(scene).emit("explosion", ball.position)
+            scene.remove(ball)
+            if p is not None:
+                p.take_damage(ball)
                 print(f"Health after hit {p.health}")
-                break
+            pools.release(ball)
+
+        returned = np.bincount(self.shooter[:self.count][done], minlength=len(self.shooters))
+        for sid in np.flatnonzero(returned).tolist():
+            shooter = self.shooters[sid]
+            shooter.projectiles_flying -= int(returned[sid])
+            self.in_flight[sid] -= int(returned[sid])
+            if not self.in_flight[sid]:
+                del self.shooter_ids[shooter]
+                self.shooters[sid] = None
+                self.free_ids.append(sid)
+
+        keep = ~done
+        remaining = int(keep.sum())
+        for name, _, _ in self.fields:
+            array = getattr(self, name)
+            array[:remaining] = array[:self.count][keep]
+        self.balls = [ball for ball, k in zip(self.balls, keep.tolist()) if k]
+        self.count = remaining
+
+
+def projectile_system(scene):
+    system = getattr(scene, "projectile_system", None)
+    if system is None:
+        system = scene.projectile_system = scene.add(ProjectileSystem())
+    return system
@@ -0,0 +1,48 @@
+import math
+
+import numpy as np
+
+
+# Local wind on a coarse, wrapping grid. Every node turns the global wind by a small angle and
+# scales its speed. The offsets drift a little every update and are pulled back towards calm,
+# so gusts come and go. Positions in between nodes are sampled bilinearly.
+class WindField:
+    max_angle = 30.0
+    max_variation = 0.4
+    drift = 0.1
+    calm = 0.1
+
+    def __init__(self, size=16, cell_size=8.0, seed=None):
+        self.size = size
+        self.cell_size = cell_size
+        self.random = np.random.default_rng(seed)
+        self.angles = self.random.uniform(-1, 1, (size, size)) * self.max_angle
+        self.variation = self.random.uniform(-1, 1, (size, size)) * self.max_variation
+        self.vectors = np.zeros((size, size, 2))
+
+    def evolve(self, time_delta):
+        noise = self.random.normal(0, math.sqrt(time_delta) * self.drift, (2, self.size, self.size))
+        pull = 1 - self.calm * time_delta
+        self.angles = np.clip(self.angles * pull + noise[0] * self.max_angle, -self.max_angle, self.max_angle)
+        self.variation = np.clip(self.variation * pull + noise[1] * self.max_variation,
+                                 -self.max_variation, self.max_variation)
+
+    # Wind vectors at the nodes for the global wind direction and speed
+    def build(self, direction, speed):
+        angles = math.atan2(direction.y, direction.x) + np.radians(self.angles)
+        speeds = speed * (1 + self.variation)
+        self.vectors[..., 0] = np.cos(angles) * speeds
+        self.vectors[..., 1] = np.sin(angles) * speeds
+
+    # Wind vector at every (x, y) row of positions
+    def sample(self, positions):
+        grid = np.asarray(positions, dtype=float).reshape(-1, 2) / self.cell_size
+        corner = np.floor(grid)
+        fx, fy = (grid - corner).T
+        x0, y0 = corner.astype(int).T % self.size
+        x1, y1 = (x0 + 1) % self.size, (y0 + 1) % self.size
+        v = self.vectors
+        return (v[x0, y0] * ((1 - fx) * (1 - fy))[:, None]
+                + v[x1, y0] * (fx * (1 - fy))[:, None]
+                + v[x0, y1] * ((1 - fx) * fy)[:, None]
+                + v[x1, y1] * (fx * fy)[:, None])
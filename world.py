@@ -0,0 +1,180 @@
+import math
+import random
+from collections import defaultdict
+
+import numpy as np
+import ppb
+from ppb.gomlib import GameObject
+
+import config
+import rng
+import ships
+from activity import activity_system
+from labels import indicator_manager
+from spatial import ship_index
+from spawning import SpawnSampler
+
+ENEMY = 0
+FLOTSAM = 1
+
+# One stored enemy or piece of flotsam, a few dozen bytes instead of a live sprite
+RECORD = np.dtype([
+    ("kind", "u1"),
+    ("state", "u1"),
+    ("anchored", "u1"),
+    ("x", "f8"),
+    ("y", "f8"),
+    ("rotation", "f4"),
+    ("target_rotation", "f4"),
+    ("health", "f4"),
+    ("speed", "f4"),
+    ("difficulty", "f4"),
+    ("anchor_timer", "f4"),
+    ("turn_timer", "f4"),
+])
+
+
+# Streams an endless ocean in square chunks around the player. A chunk is generated from its own
+# seeded random stream the first time it comes within chunk_load_radius. Enemies and flotsam that end
+# up farther than chunk_unload_radius chunks away are packed into records of the chunk they are in
+# and removed from the scene, and come back when the player returns.
+class World(GameObject):
+    player = None
+    wind = None
+    update_interval = 0.5
+    max_difficulty = 4.0
+    # Nothing spawns this close to the player
+    safe_radius = 3
+
+    def __init__(self, **props):
+        super().__init__(**props)
+        self.chunk_size = config.chunk_size
+        self.seed = rng.stream("world").getrandbits(64)
+        self.update_timer = self.update_interval
+        self.generated = set()
+        self.loaded = set()
+        self.stored = {}
+
+    def chunk(self, position):
+        return math.floor(position.x / self.chunk_size), math.floor(position.y / self.chunk_size)
+
+    def on_update(self, update_event, signal):
+        self.update_timer += update_event.time_delta
+        if self.player is None or self.update_timer < self.update_interval:
+            return
+        self.update_timer = 0
+        scene = update_event.scene
+        cx, cy = self.chunk(self.player.position)
+        r = config.chunk_load_radius
+        for coord in ((cx + dx, cy + dy) for dx in range(-r, r + 1) for dy in range(-r, r + 1)):
+            if coord not in self.loaded:
+                self.load(scene, coord)
+        self.unload_distant(scene, (cx, cy))
+
+    def load(self, scene, coord):
+        self.loaded.add(coord)
+        # Ships that sailed into the chunk before it was ever generated come back first, so new
+        # spawns are placed around them
+        records = self.stored.pop(coord, None)
+        if records is not None:
+            for record in np.frombuffer(records, dtype=RECORD):
+                self.add(scene, self.restore(record))
+        if coord not in self.generated:
+            self.generated.add(coord)
+            self.generate(scene, coord)
+
+    def generate(self, scene, coord):
+        cx, cy = coord
+        chunk_random = random.Random(f"{self.seed}:{cx}:{cy}")
+        left, bottom = cx * self.chunk_size, cy * self.chunk_size
+        spawns = SpawnSampler(chunk_random)
+        spawns.reserve(self.player.position, self.safe_radius)
+        # Ships already sailing around in this chunk, and flotsam, which isn't in the ship index
+        centre = ppb.Vector(left, bottom) + ppb.Vector(1, 1) * (self.chunk_size / 2)
+        for ship in ship_index(scene).query(centre, self.chunk_size):
+            spawns.reserve(ship.position, ship.size)
+        for flotsam in scene.get(kind=ships.Flotsam):
+            reach = self.chunk_size / 2 + flotsam.size
+            if abs(flotsam.position.x - centre.x) <= reach and abs(flotsam.position.y - centre.y) <= reach:
+                spawns.reserve(flotsam.position, flotsam.size)
+
+        difficulty = min(1 + 0.5 * max(abs(cx), abs(cy)), self.max_difficulty)
+        for _ in range(config.chunk_enemies):
+            position = spawns.place_in(left, bottom, self.chunk_size, self.chunk_size, ships.Enemy.size)
+            if position is None:
+                break
+            angle = chunk_random.random() * math.tau
+            self.add(scene, ships.Enemy.with_difficulty(
+                difficulty,
+                position=position,
+                wind=self.wind,
+                facing=ppb.Vector(math.cos(angle), math.sin(angle)),
+                is_anchored=True,
+                anchor_timer=chunk_random.random() * 20,
+                turn_timer=chunk_random.random() * 15))
+        for _ in range(config.chunk_flotsam):
+            position = spawns.place_in(left, bottom, self.chunk_size, self.chunk_size, ships.Flotsam.size)
+            if position is not None:
+                self.add(scene, ships.Flotsam(position=position))
+
+    def add(self, scene, obj):
+        scene.add(obj)
+        if isinstance(obj, ships.Ship):
+            # Indexed right away rather than on its first update, for chunks generated next to it
+            ship_index(scene).insert(obj, obj.position, obj.size)
+        indicator_manager(scene).track(obj)
+
+    def remove(self, scene, obj):
+        scene.remove(obj)
+        ship_index(scene).remove(obj)
+        indicator_manager(scene).discard(obj)
+        activity_system(scene).forget(obj)
+
+    def unload_distant(self, scene, centre):
+        def distant(coord):
+            return max(abs(coord[0] - centre[0]), abs(coord[1] - centre[1])) > config.chunk_unload_radius
+
+        leaving = defaultdict(list)
+        for obj in [*scene.get(kind=ships.Enemy), *scene.get(kind=ships.Flotsam)]:
+            coord = self.chunk(obj.position)
+            if distant(coord):
+                leaving[coord].append(obj)
+        for coord, objects in leaving.items():
+            records = np.array([self.record(obj) for obj in objects], dtype=RECORD)
+            self.stored[coord] = self.stored.get(coord, b"") + records.tobytes()
+            for obj in objects:
+                self.remove(scene, obj)
+        self.loaded = {coord for coord in self.loaded if not distant(coord)}
+
+    @staticmethod
+    def record(obj):
+        if isinstance(obj, ships.Enemy):
+            return (ENEMY, obj.state, obj.is_anchored, obj.position.x, obj.position.y, obj.rotation,
+                    obj.target_rotation, obj.health, obj.speed, obj.difficulty, obj.anchor_timer, obj.turn_timer)
+        return (FLOTSAM, 0, 0, obj.position.x, obj.position.y, 0, 0, 0, 0, 0, 0, 0)
+
+    def restore(self, record):
+        position = ppb.Vector(float(record["x"]), float(record["y"]))
+        if record["kind"] == FLOTSAM:
+            return ships.Flotsam(position=position)
+        enemy = ships.Enemy.with_difficulty(
+            float(record["difficulty"]),
+            position=position,
+            wind=self.wind,
+            rotation=float(record["rotation"]),
+            target_rotation=float(record["target_rotation"]),
+            is_anchored=bool(record["anchored"]),
+            anchor_timer=float(record["anchor_timer"]),
+            turn_timer=float(record["turn_timer"]),
+            speed=float(record["speed"]),
+            state=int(record["state"]))
+        # Ships start out with full health
+        enemy.health = float(record["health"])
+        return enemy
+
+    def memory(self):
+        return {
+            "loaded_chunks": len(self.loaded),
+            "stored_chunks": len(self.stored),
+            "stored_bytes": sum(len(records) for records in self.stored.values()),
+        }